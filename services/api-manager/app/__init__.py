@@ -110,6 +110,9 @@ async def create_app(config_class: type = Config) -> Quart:
         """Prometheus metrics endpoint."""
         return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
 
+    # Compile the URL map now rather than on the first request
+    app.url_map.update()
+
     return app
 
 
@@ -8,11 +8,11 @@ management, and terminal I/O forwarding.
 from __future__ import annotations
 
 import asyncio
+import fcntl
 import json
 import logging
 import os
 import pty
-import select
 import struct
 import subprocess
 import termios
@@ -26,6 +26,28 @@ from .models import get_db
 
 log = logging.getLogger(__name__)
 
+# Number of output frames sent before the reader yields to the event loop,
+# so a burst from one session cannot starve the other sessions' readers.
+_OUTPUT_YIELD_EVERY = 50
+
+# Map session types to commands
+# In production, this would be more sophisticated
+_COMMAND_MAP = {
+    "ssh": "/bin/bash",
+    "kubectl": "/bin/bash",  # Would wrap kubectl
+    "docker": "/bin/bash",  # Would wrap docker exec
+    "cloud_cli": "/bin/bash",  # Would wrap cloud CLI tools
+}
+_DEFAULT_COMMAND = "/bin/bash"
+
+# Output frames are built around the encoded text so only the payload goes
+# through the JSON encoder; matches json.dumps({"type": "output", "data": ...})
+_OUTPUT_FRAME_PREFIX = '{"type": "output", "data": '
+_OUTPUT_FRAME_SUFFIX = "}"
+
+# struct winsize layout for the TIOCSWINSZ ioctl
+_WINSZ_STRUCT = struct.Struct("HHHH")
+
 
 def init_websocket(app: Quart) -> None:
     """Initialize Quart native WebSocket routes for shell sessions.
@@ -76,7 +98,8 @@ def init_websocket(app: Quart) -> None:
             cols = int(websocket.args.get("cols", 80))
 
             manager = ShellSessionManager(session_id)
-            command = _get_shell_command(session.session_type)
+            manager.started_at = session.started_at
+            command = _COMMAND_MAP.get(session.session_type, _DEFAULT_COMMAND)
             await manager.start(command=command, rows=rows, cols=cols)
 
             # Send connected message
@@ -103,27 +126,22 @@ def init_websocket(app: Quart) -> None:
                 # Cleanup
                 await manager.cleanup()
 
-                # Update session in database
-                session = (
-                    db(db.shell_sessions.session_id == session_id)
-                    .select()
-                    .first()
-                )
+                # Close the session unless it was already terminated
+                ended_at = datetime.utcnow()
+                updated = db(
+                    (db.shell_sessions.session_id == session_id)
+                    & (db.shell_sessions.ended_at == None)  # noqa: E711
+                ).update(ended_at=ended_at)
+                db.commit()
 
-                if session and not session.ended_at:
+                if updated:
                     # Calculate duration
                     duration_seconds = None
-                    if session.started_at:
+                    if manager.started_at:
                         duration_seconds = int(
-                            (datetime.utcnow() - session.started_at).total_seconds()
+                            (ended_at - manager.started_at).total_seconds()
                         )
 
-                    # Update session
-                    db(db.shell_sessions.session_id == session_id).update(
-                        ended_at=datetime.utcnow()
-                    )
-                    db.commit()
-
                     # Audit log
                     audit_logger = get_audit_logger()
                     if audit_logger:
@@ -144,27 +162,6 @@ def init_websocket(app: Quart) -> None:
     log.info("Quart WebSocket initialized for shell sessions")
 
 
-def _get_shell_command(session_type: str) -> str:
-    """Get shell command based on session type.
-
-    Args:
-        session_type: Type of session (ssh, kubectl, docker, cloud_cli)
-
-    Returns:
-        Shell command to execute
-    """
-    # Map session types to commands
-    # In production, this would be more sophisticated
-    commands = {
-        "ssh": "/bin/bash",
-        "kubectl": "/bin/bash",  # Would wrap kubectl
-        "docker": "/bin/bash",  # Would wrap docker exec
-        "cloud_cli": "/bin/bash",  # Would wrap cloud CLI tools
-    }
-
-    return commands.get(session_type, "/bin/bash")
-
-
 class ShellSessionManager:
     """Manages PTY sessions for shell access.
 
@@ -182,6 +179,7 @@ class ShellSessionManager:
         self.slave_fd: Optional[int] = None
         self.process: Optional[subprocess.Popen] = None
         self.reader_task: Optional[asyncio.Task] = None
+        self.started_at: Optional[datetime] = None
         self.running = False
 
     async def start(
@@ -227,40 +225,50 @@ class ShellSessionManager:
     async def _read_output(self) -> None:
         """Read output from PTY and send via WebSocket.
 
-        Runs as async task to continuously read PTY output.
+        Runs as async task to continuously read PTY output. The master fd
+        is registered with the event loop's selector so no thread is tied
+        up polling it between reads.
         """
-        while self.running and self.master_fd:
-            try:
-                # Use select to check if data is available
-                readable, _, _ = await asyncio.to_thread(
-                    select.select, [self.master_fd], [], [], 0.1
-                )
-
-                if self.master_fd in readable:
-                    # Read output from PTY
-                    try:
-                        output = await asyncio.to_thread(os.read, self.master_fd, 1024)
-
-                        if not output:
-                            # EOF - process terminated
-                            self.running = False
-                            break
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        loop.add_reader(self.master_fd, readable.set)
+        frames_sent = 0
 
-                        # Send output via WebSocket
-                        await websocket.send(json.dumps({
-                            "type": "output",
-                            "data": output.decode("utf-8", errors="replace")
-                        }))
-
-                    except OSError as e:
-                        log.warning(f"Error reading PTY output: {e}")
-                        self.running = False
-                        break
+        try:
+            while self.running and self.master_fd:
+                await readable.wait()
+                readable.clear()
+
+                # Read output from PTY
+                try:
+                    output = os.read(self.master_fd, 1024)
+                except OSError as e:
+                    log.warning(f"Error reading PTY output: {e}")
+                    self.running = False
+                    break
+
+                if not output:
+                    # EOF - process terminated
+                    self.running = False
+                    break
+
+                try:
+                    # Send output via WebSocket
+                    await websocket.send(
+                        _OUTPUT_FRAME_PREFIX
+                        + json.dumps(output.decode("utf-8", errors="replace"))
+                        + _OUTPUT_FRAME_SUFFIX
+                    )
+                except Exception as e:
+                    log.exception(f"Error in output reader: {e}")
+                    self.running = False
+                    break
 
-            except Exception as e:
-                log.exception(f"Error in output reader: {e}")
-                self.running = False
-                break
+                frames_sent += 1
+                if frames_sent % _OUTPUT_YIELD_EVERY == 0:
+                    await asyncio.sleep(0)
+        finally:
+            loop.remove_reader(self.master_fd)
 
         # Notify disconnect
         try:
@@ -296,8 +304,7 @@ class ShellSessionManager:
         if self.master_fd:
             try:
                 # Set window size using TIOCSWINSZ ioctl
-                winsize = struct.pack("HHHH", rows, cols, 0, 0)
-                import fcntl
+                winsize = _WINSZ_STRUCT.pack(rows, cols, 0, 0)
                 await asyncio.to_thread(
                     fcntl.ioctl, self.master_fd, termios.TIOCSWINSZ, winsize
                 )
@@ -4,13 +4,60 @@ Configuration management for worker-ipxe.
 Loads configuration from environment variables with validation.
 """
 
+import functools
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Callable, Optional
 from decouple import config
 
 
-@dataclass(slots=True)
+def _raw(value: Any) -> Any:
+    """Pass-through cast that keeps None defaults intact."""
+    return value
+
+
+# Environment variable -> (attribute, cast, default)
+_ENV_SPEC: dict[str, tuple[str, Callable[[Any], Any], Any]] = {
+    # API Manager connection
+    "API_MANAGER_URL": ("api_manager_url", _raw, "http://api-manager:5000"),
+    "WORKER_API_KEY": ("worker_api_key", _raw, "worker-secret"),
+    "WORKER_ID": ("worker_id", _raw, os.environ.get("HOSTNAME", "worker-ipxe-1")),
+    # DHCP settings
+    "DHCP_MODE": ("dhcp_mode", _raw, "proxy"),
+    "DHCP_INTERFACE": ("dhcp_interface", _raw, "eth0"),
+    "DHCP_SUBNET": ("dhcp_subnet", _raw, None),
+    "DHCP_RANGE_START": ("dhcp_range_start", _raw, None),
+    "DHCP_RANGE_END": ("dhcp_range_end", _raw, None),
+    "DHCP_GATEWAY": ("dhcp_gateway", _raw, None),
+    "DHCP_DNS_SERVERS": ("dhcp_dns_servers", _raw, "8.8.8.8,8.8.4.4"),
+    # TFTP settings
+    "TFTP_ENABLED": ("tftp_enabled", bool, True),
+    "TFTP_PORT": ("tftp_port", int, 69),
+    "TFTP_ROOT": ("tftp_root", _raw, "/var/lib/ipxe/tftp"),
+    # HTTP boot settings
+    "HTTP_PORT": ("http_port", int, 8080),
+    "HTTP_BOOT_URL": ("http_boot_url", _raw, None),
+    # Storage settings
+    "STORAGE_ENDPOINT": ("storage_endpoint", _raw, None),
+    "STORAGE_ACCESS_KEY": ("storage_access_key", _raw, None),
+    "STORAGE_SECRET_KEY": ("storage_secret_key", _raw, None),
+    "STORAGE_BUCKET_BOOT_IMAGES": ("storage_bucket_boot", _raw, "boot-images"),
+    "STORAGE_BUCKET_EGGS": ("storage_bucket_eggs", _raw, "eggs"),
+    "STORAGE_USE_SSL": ("storage_use_ssl", bool, False),
+    # Worker behavior
+    "HEARTBEAT_INTERVAL": ("heartbeat_interval", int, 30),
+    "ENROLLMENT_RETRY_INTERVAL": ("enrollment_retry_interval", int, 10),
+    "MAX_ENROLLMENT_RETRIES": ("max_enrollment_retries", int, 60),
+    "BOOT_SCRIPT_CACHE_TTL": ("boot_script_cache_ttl", int, 10),
+    # Logging
+    "LOG_LEVEL": ("log_level", _raw, "INFO"),
+    # Metrics
+    "METRICS_ENABLED": ("metrics_enabled", bool, True),
+    "METRICS_PORT": ("metrics_port", int, 9090),
+}
+
+
+@dataclass(slots=True, frozen=True)
 class WorkerConfig:
     """Worker-iPXE configuration."""
 
@@ -49,6 +96,7 @@ class WorkerConfig:
     heartbeat_interval: int = 30  # seconds
     enrollment_retry_interval: int = 10  # seconds
     max_enrollment_retries: int = 60
+    boot_script_cache_ttl: int = 10  # seconds
 
     # Logging
     log_level: str = "INFO"
@@ -60,107 +108,47 @@ class WorkerConfig:
     @classmethod
     def from_env(cls) -> "WorkerConfig":
         """Load configuration from environment variables."""
+        kwargs = {
+            attr: config(env, default=default, cast=cast)
+            for env, (attr, cast, default) in _ENV_SPEC.items()
+        }
 
-        # Required settings
-        api_manager_url = config("API_MANAGER_URL", default="http://api-manager:5000")
-        worker_api_key = config("WORKER_API_KEY", default="worker-secret")
-        worker_id = config("WORKER_ID", default=os.environ.get("HOSTNAME", "worker-ipxe-1"))
-
-        # DHCP settings
-        dhcp_mode = config("DHCP_MODE", default="proxy")
+        # Validate DHCP mode
+        dhcp_mode = kwargs["dhcp_mode"]
         if dhcp_mode not in ["full", "proxy", "disabled"]:
             raise ValueError(f"Invalid DHCP_MODE: {dhcp_mode}. Must be full, proxy, or disabled.")
 
-        dhcp_interface = config("DHCP_INTERFACE", default="eth0")
-
-        # Optional DHCP settings (required for full mode)
-        dhcp_subnet = config("DHCP_SUBNET", default=None)
-        dhcp_range_start = config("DHCP_RANGE_START", default=None)
-        dhcp_range_end = config("DHCP_RANGE_END", default=None)
-        dhcp_gateway = config("DHCP_GATEWAY", default=None)
-        dhcp_dns_servers = config("DHCP_DNS_SERVERS", default="8.8.8.8,8.8.4.4")
-
         # Validate full DHCP mode requirements
         if dhcp_mode == "full":
-            if not all([dhcp_subnet, dhcp_range_start, dhcp_range_end, dhcp_gateway]):
+            required = ("dhcp_subnet", "dhcp_range_start", "dhcp_range_end", "dhcp_gateway")
+            if not all(kwargs[attr] for attr in required):
                 raise ValueError(
                     "DHCP_MODE=full requires DHCP_SUBNET, DHCP_RANGE_START, "
                     "DHCP_RANGE_END, and DHCP_GATEWAY to be set."
                 )
 
-        # TFTP settings
-        tftp_enabled = config("TFTP_ENABLED", default=True, cast=bool)
-        tftp_port = config("TFTP_PORT", default=69, cast=int)
-        tftp_root = config("TFTP_ROOT", default="/var/lib/ipxe/tftp")
-
-        # HTTP boot settings
-        http_port = config("HTTP_PORT", default=8080, cast=int)
-        http_boot_url = config("HTTP_BOOT_URL", default=None)
-
-        # Storage settings
-        storage_endpoint = config("STORAGE_ENDPOINT", default=None)
-        storage_access_key = config("STORAGE_ACCESS_KEY", default=None)
-        storage_secret_key = config("STORAGE_SECRET_KEY", default=None)
-        storage_bucket_boot = config("STORAGE_BUCKET_BOOT_IMAGES", default="boot-images")
-        storage_bucket_eggs = config("STORAGE_BUCKET_EGGS", default="eggs")
-        storage_use_ssl = config("STORAGE_USE_SSL", default=False, cast=bool)
-
-        # Worker behavior
-        heartbeat_interval = config("HEARTBEAT_INTERVAL", default=30, cast=int)
-        enrollment_retry_interval = config("ENROLLMENT_RETRY_INTERVAL", default=10, cast=int)
-        max_enrollment_retries = config("MAX_ENROLLMENT_RETRIES", default=60, cast=int)
-
-        # Logging
-        log_level = config("LOG_LEVEL", default="INFO")
-
-        # Metrics
-        metrics_enabled = config("METRICS_ENABLED", default=True, cast=bool)
-        metrics_port = config("METRICS_PORT", default=9090, cast=int)
-
-        return cls(
-            api_manager_url=api_manager_url,
-            worker_api_key=worker_api_key,
-            worker_id=worker_id,
-            dhcp_mode=dhcp_mode,
-            dhcp_interface=dhcp_interface,
-            dhcp_subnet=dhcp_subnet,
-            dhcp_range_start=dhcp_range_start,
-            dhcp_range_end=dhcp_range_end,
-            dhcp_gateway=dhcp_gateway,
-            dhcp_dns_servers=dhcp_dns_servers,
-            tftp_enabled=tftp_enabled,
-            tftp_port=tftp_port,
-            tftp_root=tftp_root,
-            http_port=http_port,
-            http_boot_url=http_boot_url,
-            storage_endpoint=storage_endpoint,
-            storage_access_key=storage_access_key,
-            storage_secret_key=storage_secret_key,
-            storage_bucket_boot=storage_bucket_boot,
-            storage_bucket_eggs=storage_bucket_eggs,
-            storage_use_ssl=storage_use_ssl,
-            heartbeat_interval=heartbeat_interval,
-            enrollment_retry_interval=enrollment_retry_interval,
-            max_enrollment_retries=max_enrollment_retries,
-            log_level=log_level,
-            metrics_enabled=metrics_enabled,
-            metrics_port=metrics_port,
-        )
+        return cls(**kwargs)
 
     def get_boot_url(self) -> str:
         """Get the HTTP boot base URL."""
-        if self.http_boot_url:
-            return self.http_boot_url
-
-        # Construct from interface IP if possible
-        try:
-            import netifaces
-            addrs = netifaces.ifaddresses(self.dhcp_interface)
-            if netifaces.AF_INET in addrs:
-                ip = addrs[netifaces.AF_INET][0]['addr']
-                return f"http://{ip}:{self.http_port}"
-        except Exception:
-            pass
-
-        # Fallback to localhost (not ideal for production)
-        return f"http://localhost:{self.http_port}"
+        return _resolve_boot_url(self.dhcp_interface, self.http_port, self.http_boot_url)
+
+
+@functools.lru_cache(maxsize=8)
+def _resolve_boot_url(interface: str, http_port: int, http_boot_url: Optional[str]) -> str:
+    """Resolve the HTTP boot base URL, probing the interface address once."""
+    if http_boot_url:
+        return http_boot_url
+
+    # Construct from interface IP if possible
+    try:
+        import netifaces
+        addrs = netifaces.ifaddresses(interface)
+        if netifaces.AF_INET in addrs:
+            ip = addrs[netifaces.AF_INET][0]['addr']
+            return f"http://{ip}:{http_port}"
+    except Exception:
+        pass
+
+    # Fallback to localhost (not ideal for production)
+    return f"http://localhost:{http_port}"
@@ -7,9 +7,10 @@ Registers the worker with the central api-manager on startup.
 import asyncio
 import structlog
 import httpx
-from typing import Optional
+from typing import Callable, Optional
 
 from worker.config import WorkerConfig
+from worker.utils.api_client import api_transport
 
 logger = structlog.get_logger()
 
@@ -22,6 +23,28 @@ class EnrollmentManager:
         self.enrolled = False
         self.session_token: Optional[str] = None
 
+        # Auth headers for api-manager requests, rebuilt when the token
+        # changes; post_headers adds the JSON content type for request bodies
+        self.auth_headers: dict[str, str] = {}
+        self.post_headers: dict[str, str] = {}
+        self._header_listeners: list[Callable[[dict[str, str]], None]] = []
+        self._set_session_token(None)
+
+    def add_header_listener(self, callback: Callable[[dict[str, str]], None]) -> None:
+        """Register a callback invoked with the new auth headers on token change."""
+        self._header_listeners.append(callback)
+
+    def _set_session_token(self, token: Optional[str]) -> None:
+        """Store a new session token and refresh the cached auth headers."""
+        self.session_token = token
+        self.auth_headers = {
+            "X-Worker-API-Key": self.config.worker_api_key,
+            "X-Worker-Session-Token": token or "",
+        }
+        self.post_headers = {**self.auth_headers, "Content-Type": "application/json"}
+        for callback in self._header_listeners:
+            callback(self.auth_headers)
+
     async def enroll(self) -> bool:
         """
         Enroll worker with api-manager.
@@ -53,7 +76,7 @@ class EnrollmentManager:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            async with httpx.AsyncClient(timeout=10.0, transport=api_transport()) as client:
                 response = await client.post(
                     enrollment_url,
                     json=payload,
@@ -62,7 +85,7 @@ class EnrollmentManager:
 
                 if response.status_code == 200:
                     data = response.json()
-                    self.session_token = data.get("session_token")
+                    self._set_session_token(data.get("session_token"))
                     self.enrolled = True
                     logger.info(
                         "worker_enrolled",
@@ -123,8 +146,9 @@ class EnrollmentManager:
         return False
 
     def get_auth_headers(self) -> dict[str, str]:
-        """Get authentication headers for API requests."""
-        return {
-            "X-Worker-API-Key": self.config.worker_api_key,
-            "X-Worker-Session-Token": self.session_token or "",
-        }
+        """Get a copy of the authentication headers for API requests.
+
+        Callers that do not modify the headers can read ``auth_headers`` or
+        ``post_headers`` directly and skip the copy.
+        """
+        return dict(self.auth_headers)
@@ -11,6 +11,7 @@ from datetime import datetime
 
 from worker.config import WorkerConfig
 from worker.enrollment import EnrollmentManager
+from worker.utils.api_client import api_transport
 
 logger = structlog.get_logger()
 
@@ -47,11 +48,11 @@ class HeartbeatManager:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
+            async with httpx.AsyncClient(timeout=5.0, transport=api_transport()) as client:
                 response = await client.post(
                     heartbeat_url,
                     json=payload,
-                    headers=self.enrollment.get_auth_headers(),
+                    headers=self.enrollment.auth_headers,
                 )
 
                 if response.status_code == 200:
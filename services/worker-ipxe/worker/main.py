@@ -8,6 +8,7 @@ import asyncio
 import logging
 import signal
 import sys
+import orjson
 import structlog
 from prometheus_client import start_http_server
 
@@ -19,16 +20,24 @@ from worker.services.http_server import HTTPBootServer
 from worker.services.dhcp_proxy import DHCPProxyServer
 from worker.services.dhcp_server import DHCPFullServer
 
-# Configure structured logging
+# uvloop speeds up the UDP/TCP paths of every service; optional so the
+# worker still runs on the stock event loop where it is unavailable
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# Configure structured logging (orjson renders straight to bytes for stdout)
 structlog.configure(
     processors=[
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.add_log_level,
-        structlog.processors.JSONRenderer(),
+        structlog.processors.JSONRenderer(serializer=orjson.dumps),
     ],
     wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
     context_class=dict,
-    logger_factory=structlog.PrintLoggerFactory(),
+    logger_factory=structlog.BytesLoggerFactory(),
     cache_logger_on_first_use=True,
 )
 
@@ -50,6 +59,7 @@ class WorkerIPXE:
 
         self.running = False
         self.tasks = []
+        self._stop_event = asyncio.Event()
 
     async def start(self):
         """Start all worker services."""
@@ -73,15 +83,18 @@ class WorkerIPXE:
         # Start heartbeat
         await self.heartbeat.start()
 
+        # The HTTP boot server's iPXE handler is shared with TFTP, which
+        # prefetches boot scripts while the iPXE binary transfers
+        self.http_server = HTTPBootServer(self.config, self.enrollment)
+
         # Start TFTP server
         if self.config.tftp_enabled:
-            self.tftp_server = TFTPServer(self.config)
+            self.tftp_server = TFTPServer(self.config, self.http_server.ipxe_handler)
             tftp_task = asyncio.create_task(self.tftp_server.start())
             self.tasks.append(tftp_task)
             logger.info("tftp_server_started", port=self.config.tftp_port)
 
         # Start HTTP boot server
-        self.http_server = HTTPBootServer(self.config, self.enrollment)
         http_task = asyncio.create_task(self.http_server.start())
         self.tasks.append(http_task)
         logger.info("http_boot_server_started", port=self.config.http_port)
@@ -108,46 +121,40 @@ class WorkerIPXE:
         logger.info("worker_stopping")
         self.running = False
 
-        # Stop heartbeat
-        await self.heartbeat.stop()
-
-        # Stop DHCP server
-        if self.dhcp_server:
-            await self.dhcp_server.stop()
-
-        # Stop HTTP server
-        if self.http_server:
-            await self.http_server.stop()
-
-        # Stop TFTP server
-        if self.tftp_server:
-            await self.tftp_server.stop()
-
-        # Cancel all tasks
+        # Cancel the serving tasks up front; the services' stop() calls only
+        # release their resources, so they run concurrently and shutdown
+        # takes as long as the slowest service rather than the sum
         for task in self.tasks:
             task.cancel()
 
-        await asyncio.gather(*self.tasks, return_exceptions=True)
+        services = (self.heartbeat, self.dhcp_server, self.http_server, self.tftp_server)
+        await asyncio.gather(
+            *(service.stop() for service in services if service),
+            return_exceptions=True,
+        )
+
+        if self.tasks:
+            _, pending = await asyncio.wait(self.tasks, timeout=5.0)
+            if pending:
+                logger.warning("worker_tasks_stop_timeout", pending=len(pending))
 
         logger.info("worker_stopped")
 
+    def _on_shutdown_signal(self):
+        """Signal handler for SIGINT/SIGTERM."""
+        logger.info("shutdown_signal_received")
+        self._stop_event.set()
+
     async def run(self):
         """Run worker until shutdown signal."""
         await self.start()
 
-        # Wait for shutdown signal
-        stop_event = asyncio.Event()
-
-        def signal_handler():
-            logger.info("shutdown_signal_received")
-            stop_event.set()
-
         loop = asyncio.get_running_loop()
         for sig in (signal.SIGINT, signal.SIGTERM):
-            loop.add_signal_handler(sig, signal_handler)
+            loop.add_signal_handler(sig, self._on_shutdown_signal)
 
-        # Wait for stop event
-        await stop_event.wait()
+        # Wait for shutdown signal
+        await self._stop_event.wait()
 
         # Cleanup
         await self.stop()
@@ -180,4 +187,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if UVLOOP_AVAILABLE:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -6,6 +6,7 @@ Works alongside existing DHCP server.
 """
 
 import asyncio
+import socket
 import struct
 import structlog
 from typing import Optional
@@ -14,6 +15,57 @@ from worker.config import WorkerConfig
 
 logger = structlog.get_logger()
 
+# BOOTP header up to and including chaddr, and the options magic cookie
+_DHCP_HEADER = struct.Struct("!BBBBIHH4s4s4s4s16s")
+_DHCP_MAGIC = struct.Struct("!I")
+
+# Per-request fields patched into the OFFER template
+_XID = struct.Struct("!I")
+_FLAGS = struct.Struct("!H")
+_CHADDR = struct.Struct("16s")
+
+# DHCP option 93 (client system architecture) -> boot file, matching the
+# binaries shipped in the TFTP root and the dnsmasq config for full mode
+_CLIENT_ARCH = struct.Struct("!H")
+_ARCH_BOOTFILE = {
+    0: b"undionly.kpxe",  # x86 BIOS
+    7: b"ipxe.efi",  # EFI BC per RFC 4578; sent by most x86-64 UEFI firmware
+    9: b"ipxe.efi",  # EFI x86-64 per RFC 4578
+}
+_DEFAULT_BOOTFILE = b"ipxe.efi"
+
+# Datagrams drained per readiness callback, and the receive buffer size
+# (DHCP messages fit a single Ethernet frame)
+RECV_BATCH = 32
+RECV_BUFSIZE = 1500
+
+
+def _parse_options(data: bytes) -> dict[int, memoryview]:
+    """Walk the DHCP option TLVs following the magic cookie.
+
+    Values are kept as zero-copy views into the datagram; callers
+    materialize bytes only for the options they use. Kept as a plain
+    function over locals since it runs for every option of every packet.
+    """
+    options = {}
+    view = memoryview(data)
+    end = len(data)
+    i = 240
+    while i < end:
+        opt_code = data[i]
+        if opt_code == 255:  # End
+            break
+        if opt_code == 0:  # Padding
+            i += 1
+            continue
+
+        opt_len = data[i + 1]
+        i += 2
+        options[opt_code] = view[i:i + opt_len]
+        i += opt_len
+
+    return options
+
 
 class DHCPProxyServer:
     """ProxyDHCP server for PXE boot."""
@@ -31,6 +83,7 @@ class DHCPProxyServer:
     # DHCP options
     DHCP_MESSAGE_TYPE = 53
     DHCP_VENDOR_CLASS_ID = 60
+    DHCP_CLIENT_ARCH = 93
     DHCP_TFTP_SERVER = 66
     DHCP_BOOT_FILE = 67
     DHCP_END = 255
@@ -38,7 +91,27 @@ class DHCPProxyServer:
     def __init__(self, config: WorkerConfig):
         self.config = config
         self.running = False
-        self.transport: Optional[asyncio.DatagramTransport] = None
+        self._sock: Optional[socket.socket] = None
+        self._stopped = asyncio.Event()
+
+        # Datagrams are received into one reusable buffer and handled
+        # before the next read, so parsed views never outlive it
+        self._recv_buf = bytearray(RECV_BUFSIZE)
+        self._recv_view = memoryview(self._recv_buf)
+
+        # The boot URL is fixed for the worker's lifetime, so the OFFER
+        # templates built from it are too
+        self._boot_url = config.get_boot_url()
+
+        # One scratch buffer per boot file, initialised from its template;
+        # only the per-request fields are rewritten, so steady-state
+        # replies allocate nothing
+        buffers = {
+            boot_file: bytearray(self._build_offer_template(self._boot_url, boot_file))
+            for boot_file in {*_ARCH_BOOTFILE.values(), _DEFAULT_BOOTFILE}
+        }
+        self._offer_bufs = {arch: buffers[boot_file] for arch, boot_file in _ARCH_BOOTFILE.items()}
+        self._default_offer_buf = buffers[_DEFAULT_BOOTFILE]
 
     def _parse_dhcp_packet(self, data: bytes) -> Optional[dict]:
         """Parse DHCP packet and extract relevant fields."""
@@ -47,38 +120,19 @@ class DHCPProxyServer:
 
         try:
             # Parse DHCP header
-            op, htype, hlen, hops = struct.unpack("!BBBB", data[0:4])
-            xid = struct.unpack("!I", data[4:8])[0]
-            flags = struct.unpack("!H", data[10:12])[0]
-            ciaddr = data[12:16]
-            yiaddr = data[16:20]
-            siaddr = data[20:24]
-            giaddr = data[24:28]
-            chaddr = data[28:44]
+            (
+                op, htype, hlen, hops, xid, secs, flags,
+                ciaddr, yiaddr, siaddr, giaddr, chaddr,
+            ) = _DHCP_HEADER.unpack_from(data, 0)
 
             # Extract MAC address
-            mac = ":".join(f"{b:02x}" for b in chaddr[:hlen])
+            mac = chaddr[:hlen].hex(":")
 
             # Parse options
-            options = {}
-            i = 236  # Options start after magic cookie
-            magic = struct.unpack("!I", data[236:240])[0]
-            if magic != 0x63825363:
+            if _DHCP_MAGIC.unpack_from(data, 236)[0] != 0x63825363:
                 return None
 
-            i = 240
-            while i < len(data):
-                opt_code = data[i]
-                if opt_code == self.DHCP_END:
-                    break
-                if opt_code == 0:  # Padding
-                    i += 1
-                    continue
-
-                opt_len = data[i + 1]
-                opt_data = data[i + 2 : i + 2 + opt_len]
-                options[opt_code] = opt_data
-                i += 2 + opt_len
+            options = _parse_options(data)
 
             return {
                 "op": op,
@@ -94,17 +148,20 @@ class DHCPProxyServer:
 
     def _is_pxe_request(self, packet: dict) -> bool:
         """Check if DHCP packet is a PXE request."""
-        vendor_class = packet["options"].get(self.DHCP_VENDOR_CLASS_ID, b"")
-        return vendor_class.startswith(b"PXEClient")
-
-    def _build_proxydhcp_offer(self, request: dict) -> bytes:
-        """Build ProxyDHCP OFFER response."""
-        boot_url = self.config.get_boot_url()
-
-        # Determine boot file based on architecture
-        # TODO: Parse architecture from DHCP option 93
-        boot_file = "ipxe.efi"  # Default to UEFI
-
+        vendor_class = packet["options"].get(self.DHCP_VENDOR_CLASS_ID)
+        return (
+            vendor_class is not None
+            and len(vendor_class) >= 9
+            and vendor_class[:9] == b"PXEClient"
+        )
+
+    def _build_offer_template(self, boot_url: str, boot_file: bytes) -> bytes:
+        """Build the constant part of the ProxyDHCP OFFER.
+
+        Everything except the transaction ID, flags and client hardware
+        address is fixed for a given boot URL and boot file, so it is built
+        once and patched per request.
+        """
         # Build DHCP packet
         packet = bytearray(300)
 
@@ -113,12 +170,8 @@ class DHCPProxyServer:
         packet[1] = 1  # Ethernet
         packet[2] = 6  # MAC address length
         packet[3] = 0  # Hops
-        struct.pack_into("!I", packet, 4, request["xid"])  # Transaction ID
-        struct.pack_into("!H", packet, 10, request["flags"])  # Flags
 
         # Addresses (all zero for ProxyDHCP)
-        # Client hardware address
-        packet[28:28 + len(request["chaddr"])] = request["chaddr"]
 
         # Magic cookie
         struct.pack_into("!I", packet, 236, 0x63825363)
@@ -135,14 +188,13 @@ class DHCPProxyServer:
         opts.extend(vendor)
 
         # Option 66: TFTP Server Name
-        tftp_server = self.config.get_boot_url().encode("ascii")
+        tftp_server = boot_url.encode("ascii")
         opts.extend([self.DHCP_TFTP_SERVER, len(tftp_server)])
         opts.extend(tftp_server)
 
         # Option 67: Boot File Name
-        boot_file_bytes = boot_file.encode("ascii")
-        opts.extend([self.DHCP_BOOT_FILE, len(boot_file_bytes)])
-        opts.extend(boot_file_bytes)
+        opts.extend([self.DHCP_BOOT_FILE, len(boot_file)])
+        opts.extend(boot_file)
 
         # End option
         opts.append(self.DHCP_END)
@@ -152,19 +204,64 @@ class DHCPProxyServer:
 
         return bytes(packet[:240 + len(opts)])
 
-    class DHCPProxyProtocol(asyncio.DatagramProtocol):
-        """Asyncio protocol for ProxyDHCP server."""
+    def _build_proxydhcp_offer(self, request: dict) -> bytearray:
+        """Build ProxyDHCP OFFER response.
 
-        def __init__(self, server):
-            self.server = server
+        Returns the server's scratch buffer, which is only valid until the
+        next call; it is sent synchronously before the next request is read.
+        """
+        # Determine boot file based on client architecture (option 93)
+        arch_opt = request["options"].get(self.DHCP_CLIENT_ARCH)
+        if arch_opt is not None and len(arch_opt) >= 2:
+            arch = _CLIENT_ARCH.unpack_from(arch_opt)[0]
+            packet = self._offer_bufs.get(arch, self._default_offer_buf)
+        else:
+            packet = self._default_offer_buf
 
-        def connection_made(self, transport):
-            self.transport = transport
+        _XID.pack_into(packet, 4, request["xid"])  # Transaction ID
+        _FLAGS.pack_into(packet, 10, request["flags"])  # Flags
 
-        def datagram_received(self, data, addr):
-            asyncio.create_task(self.server._handle_packet(data, addr))
+        # Client hardware address (zero-padded to the full field)
+        _CHADDR.pack_into(packet, 28, request["chaddr"])
 
-    async def _handle_packet(self, data: bytes, addr: tuple):
+        return packet
+
+    def _open_socket(self) -> socket.socket:
+        """Create the non-blocking ProxyDHCP listening socket."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            # SO_REUSEPORT lets several worker processes bind 4011 and have
+            # the kernel spread incoming DISCOVERs across them
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            sock.setblocking(False)
+            sock.bind(("0.0.0.0", self.PROXYDHCP_PORT))
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _drain_socket(self):
+        """Handle queued datagrams when the socket becomes readable.
+
+        Reads up to RECV_BATCH datagrams per wake-up so a PXE burst costs
+        one event loop round trip per batch instead of one per packet.
+        Parsing and building the reply are pure CPU and sendto() does not
+        block, so packets are handled inline.
+        """
+        sock = self._sock
+        buf = self._recv_buf
+        view = self._recv_view
+        for _ in range(RECV_BATCH):
+            try:
+                nbytes, addr = sock.recvfrom_into(buf)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                logger.error("proxydhcp_recv_error", error=str(e))
+                return
+            self._handle_packet(view[:nbytes], addr)
+
+    def _handle_packet(self, data: bytes, addr: tuple):
         """Handle incoming DHCP packet."""
         packet = self._parse_dhcp_packet(data)
         if not packet:
@@ -189,7 +286,13 @@ class DHCPProxyServer:
 
             # Send ProxyDHCP OFFER
             offer = self._build_proxydhcp_offer(packet)
-            self.transport.sendto(offer, (addr[0], self.DHCP_CLIENT_PORT))
+            try:
+                self._sock.sendto(offer, (addr[0], self.DHCP_CLIENT_PORT))
+            except OSError as e:
+                # Send buffer full or host unreachable; the client
+                # retransmits its DISCOVER
+                logger.warning("proxydhcp_send_error", client=addr[0], error=str(e))
+                return
 
             logger.debug(
                 "proxydhcp_offer_sent",
@@ -202,10 +305,8 @@ class DHCPProxyServer:
         loop = asyncio.get_running_loop()
 
         try:
-            self.transport, _ = await loop.create_datagram_endpoint(
-                lambda: self.DHCPProxyProtocol(self),
-                local_addr=("0.0.0.0", self.PROXYDHCP_PORT),
-            )
+            self._sock = self._open_socket()
+            loop.add_reader(self._sock.fileno(), self._drain_socket)
             self.running = True
 
             logger.info(
@@ -214,9 +315,8 @@ class DHCPProxyServer:
                 interface=self.config.dhcp_interface,
             )
 
-            # Keep running
-            while self.running:
-                await asyncio.sleep(1)
+            # Keep running until stop() is called
+            await self._stopped.wait()
 
         except Exception as e:
             logger.error("proxydhcp_server_error", error=str(e))
@@ -225,6 +325,9 @@ class DHCPProxyServer:
     async def stop(self):
         """Stop ProxyDHCP server."""
         self.running = False
-        if self.transport:
-            self.transport.close()
+        self._stopped.set()
+        if self._sock:
+            asyncio.get_running_loop().remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
             logger.info("proxydhcp_server_stopped")
@@ -15,6 +15,12 @@ from worker.config import WorkerConfig
 
 logger = structlog.get_logger()
 
+# tmpfs-backed directory preferred for the generated dnsmasq config
+CONFIG_DIR = "/run"
+
+# Read size used when draining dnsmasq log output
+LOG_READ_SIZE = 64 * 1024
+
 
 class DHCPFullServer:
     """Full DHCP server using dnsmasq."""
@@ -25,6 +31,9 @@ class DHCPFullServer:
         self.process: Optional[asyncio.subprocess.Process] = None
         self.config_file: Optional[Path] = None
 
+        # Configuration is static for the worker's lifetime, render it once
+        self._config_text = self._generate_dnsmasq_config()
+
     def _generate_dnsmasq_config(self) -> str:
         """Generate dnsmasq configuration."""
         boot_url = self.config.get_boot_url()
@@ -85,12 +94,17 @@ pid-file=/tmp/dnsmasq.pid
 
     async def start(self):
         """Start dnsmasq DHCP server."""
-        # Generate configuration file
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".conf", delete=False, prefix="gough-dhcp-"
-        ) as f:
-            config_content = self._generate_dnsmasq_config()
-            f.write(config_content)
+        # Write configuration file, preferring tmpfs over the temp dir
+        try:
+            config_fh = tempfile.NamedTemporaryFile(
+                mode="w", suffix=".conf", delete=False, prefix="gough-dhcp-", dir=CONFIG_DIR
+            )
+        except OSError:
+            config_fh = tempfile.NamedTemporaryFile(
+                mode="w", suffix=".conf", delete=False, prefix="gough-dhcp-"
+            )
+        with config_fh as f:
+            f.write(self._config_text)
             self.config_file = Path(f.name)
 
         logger.info(
@@ -140,13 +154,30 @@ pid-file=/tmp/dnsmasq.pid
             return
 
         try:
-            async for line in self.process.stderr:
-                log_line = line.decode("utf-8", errors="ignore").strip()
-                if log_line:
-                    logger.info("dnsmasq_log", message=log_line)
+            # Drain in large chunks; a partial trailing line is carried over
+            # to the next read
+            pending = b""
+            while True:
+                chunk = await self.process.stderr.read(LOG_READ_SIZE)
+                if not chunk:
+                    break
+
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    self._log_dnsmasq_line(line)
+
+            self._log_dnsmasq_line(pending)
         except Exception as e:
             logger.error("dhcp_log_monitor_error", error=str(e))
 
+    @staticmethod
+    def _log_dnsmasq_line(line: bytes) -> None:
+        """Log a single line of dnsmasq output."""
+        log_line = line.decode("utf-8", errors="ignore").strip()
+        if log_line:
+            logger.info("dnsmasq_log", message=log_line)
+
     async def stop(self):
         """Stop DHCP server."""
         self.running = False
@@ -4,18 +4,76 @@ HTTP boot server for iPXE scripts, kernels, and cloud-init.
 Provides dynamic iPXE script generation and serves boot images.
 """
 
+import time
 import structlog
-from quart import Quart, request, Response, jsonify
+from typing import AsyncIterator, Optional
+from quart import Quart, g, request, Response, jsonify
 from hypercorn.config import Config
 from hypercorn.asyncio import serve
 import httpx
+import orjson
 
 from worker.config import WorkerConfig
 from worker.enrollment import EnrollmentManager
 from worker.services.ipxe_handler import IPXEHandler
+from worker.utils.api_client import api_transport
 
 logger = structlog.get_logger()
 
+# Read size used when relaying boot images from storage
+IMAGE_CHUNK_SIZE = 64 * 1024
+
+
+class _UpstreamBody:
+    """Response body relaying a streamed upstream response.
+
+    Quart calls aclose() on the body iterator when the response finishes,
+    including when the client goes away before the first chunk. A plain
+    async generator's finally block never runs if iteration never started,
+    which would leak the upstream connection.
+    """
+
+    def __init__(self, upstream: httpx.Response):
+        self._upstream = upstream
+        self._chunks = upstream.aiter_raw(IMAGE_CHUNK_SIZE)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> bytes:
+        try:
+            return await self._chunks.__anext__()
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def aclose(self):
+        await self._upstream.aclose()
+
+
+class _PrefetchedBody:
+    """Response body that replays an already-read first chunk, then the rest.
+
+    aclose() closes the source so its upstream stream is released even if
+    the body is never iterated.
+    """
+
+    def __init__(self, first_chunk: bytes, chunks: AsyncIterator[bytes]):
+        self._first_chunk: Optional[bytes] = first_chunk
+        self._chunks = chunks
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> bytes:
+        if self._first_chunk is not None:
+            chunk, self._first_chunk = self._first_chunk, None
+            return chunk
+        return await self._chunks.__anext__()
+
+    async def aclose(self):
+        await self._chunks.aclose()
+
 
 class HTTPBootServer:
     """HTTP server for boot files and iPXE scripts."""
@@ -27,12 +85,32 @@ class HTTPBootServer:
         self.ipxe_handler = IPXEHandler(config, enrollment)
         self.server_task = None
 
+        # Shared HTTP client for api-manager and storage, opened in start()
+        self._http: Optional[httpx.AsyncClient] = None
+
         # Register routes
         self._register_routes()
 
     def _register_routes(self):
         """Register HTTP routes."""
 
+        @self.app.before_request
+        async def start_timer():
+            g.request_start = time.perf_counter()
+
+        @self.app.after_request
+        async def log_access(response: Response):
+            """Emit one structured access event per request."""
+            logger.info(
+                "http_access",
+                method=request.method,
+                path=request.path,
+                status=response.status_code,
+                client_ip=request.remote_addr,
+                elapsed_ms=round((time.perf_counter() - g.request_start) * 1000, 2),
+            )
+            return response
+
         @self.app.route("/health")
         async def health():
             """Health check endpoint."""
@@ -75,13 +153,17 @@ class HTTPBootServer:
             """Cloud-init user-data endpoint."""
             logger.info("cloud_init_userdata_request", machine_id=machine_id)
 
+            # Streamed through as it arrives from api-manager. The first chunk
+            # is read here so a failure surfaces before the status is sent.
+            userdata = self.ipxe_handler.get_cloud_init_userdata(machine_id)
             try:
-                userdata = await self.ipxe_handler.get_cloud_init_userdata(machine_id)
-                return Response(userdata, mimetype="text/cloud-config")
+                first_chunk = await anext(userdata, b"")
             except Exception as e:
                 logger.error("cloud_init_userdata_error", machine_id=machine_id, error=str(e))
                 return Response(f"#cloud-config\n# Error: {e}\n", mimetype="text/cloud-config", status=500)
 
+            return Response(_PrefetchedBody(first_chunk, userdata), mimetype="text/cloud-config")
+
         @self.app.route("/images/<path:image_path>")
         async def serve_image(image_path: str):
             """
@@ -94,30 +176,46 @@ class HTTPBootServer:
             try:
                 # Request presigned URL from api-manager
                 api_url = f"{self.config.api_manager_url}/api/v1/internal/image-url/{image_path}"
-                headers = self.enrollment.get_auth_headers()
-
-                async with httpx.AsyncClient(timeout=10.0) as client:
-                    response = await client.get(api_url, headers=headers)
-
-                    if response.status_code == 200:
-                        data = response.json()
-                        presigned_url = data.get("url")
-
-                        # Stream image from storage
-                        async with httpx.AsyncClient(timeout=300.0) as storage_client:
-                            image_response = await storage_client.get(presigned_url)
-                            return Response(
-                                image_response.content,
-                                mimetype="application/octet-stream",
-                                headers={
-                                    "Content-Length": str(len(image_response.content)),
-                                    "Cache-Control": "public, max-age=3600",
-                                },
-                            )
-                    else:
-                        logger.error("image_url_fetch_failed", status=response.status_code)
+                response = await self._http.get(
+                    api_url, headers=self.enrollment.auth_headers, timeout=10.0
+                )
+
+                if response.status_code == 200:
+                    data = orjson.loads(response.content)
+                    presigned_url = data.get("url")
+
+                    # Stream image from storage without buffering it
+                    image_response = await self._http.send(
+                        self._http.build_request(
+                            "GET",
+                            presigned_url,
+                            headers={"Accept-Encoding": "identity"},
+                        ),
+                        stream=True,
+                    )
+
+                    if image_response.status_code != 200:
+                        await image_response.aclose()
+                        logger.error(
+                            "image_fetch_failed",
+                            path=image_path,
+                            status=image_response.status_code,
+                        )
                         return Response("Image not found", status=404)
 
+                    headers = {"Cache-Control": "public, max-age=3600"}
+                    if "Content-Length" in image_response.headers:
+                        headers["Content-Length"] = image_response.headers["Content-Length"]
+
+                    return Response(
+                        _UpstreamBody(image_response),
+                        mimetype="application/octet-stream",
+                        headers=headers,
+                    )
+                else:
+                    logger.error("image_url_fetch_failed", status=response.status_code)
+                    return Response("Image not found", status=404)
+
             except Exception as e:
                 logger.error("image_serve_error", path=image_path, error=str(e))
                 return Response("Error serving image", status=500)
@@ -130,16 +228,20 @@ class HTTPBootServer:
             Called by cloud-init during provisioning to report progress.
             """
             data = await request.get_json()
-            logger.info("boot_event_received", event=data)
+            logger.info("boot_event_received", payload=data)
 
             try:
                 # Forward event to api-manager
                 api_url = f"{self.config.api_manager_url}/api/v1/internal/boot-event"
-                headers = self.enrollment.get_auth_headers()
-                headers["Content-Type"] = "application/json"
+                await self._http.post(
+                    api_url, json=data, headers=self.enrollment.post_headers, timeout=5.0
+                )
 
-                async with httpx.AsyncClient(timeout=5.0) as client:
-                    await client.post(api_url, json=data, headers=headers)
+                # Provisioning moved on; stop serving the machine's old state
+                if isinstance(data, dict):
+                    await self.ipxe_handler.invalidate(
+                        mac=data.get("mac"), machine_id=data.get("machine_id")
+                    )
 
                 return jsonify({"status": "received"})
             except Exception as e:
@@ -150,9 +252,19 @@ class HTTPBootServer:
         """Start HTTP server."""
         config = Config()
         config.bind = [f"0.0.0.0:{self.config.http_port}"]
-        config.accesslog = "-"
+        config.accesslog = None  # Access events are logged via structlog
         config.errorlog = "-"
 
+        self._http = httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0, read=300.0),
+            # http2 goes on the transport; AsyncClient ignores its own flag
+            # when a transport is passed
+            transport=api_transport(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=64, max_connections=256),
+            ),
+        )
+
         logger.info("http_server_starting", port=self.config.http_port)
 
         try:
@@ -163,4 +275,8 @@ class HTTPBootServer:
 
     async def stop(self):
         """Stop HTTP server."""
+        if self._http:
+            await self._http.aclose()
+            self._http = None
+        await self.ipxe_handler.aclose()
         logger.info("http_server_stopped")
@@ -4,15 +4,86 @@ iPXE script generation and cloud-init handling.
 Queries api-manager for machine state and generates appropriate boot scripts.
 """
 
+import asyncio
+import functools
+import string
 import structlog
 import httpx
-from typing import Optional
+import orjson
+import diskcache
+from cachetools import TTLCache
+from typing import AsyncIterator, Optional
 
 from worker.config import WorkerConfig
 from worker.enrollment import EnrollmentManager
+from worker.utils.api_client import api_transport
 
 logger = structlog.get_logger()
 
+# Boot scripts are cached per MAC for config.boot_script_cache_ttl seconds;
+# a machine asks for its script several times in one boot
+BOOT_SCRIPT_CACHE_SIZE = 4096
+
+USERDATA_CHUNK_SIZE = 64 * 1024
+
+# Cloud-init meta-data is cached on tmpfs so it survives worker restarts
+METADATA_CACHE_DIR = "/run/gough/cloudinit"
+METADATA_CACHE_SIZE = 64 * 1024 * 1024
+METADATA_CACHE_TTL = 3600  # seconds
+
+# iPXE scripts served when no machine-specific script is available
+_DISCOVERY_TEMPLATE = string.Template("""#!ipxe
+# Discovery script for new machine: $mac
+
+echo ======================================
+echo Gough Provisioning - Machine Discovery
+echo ======================================
+echo MAC Address: $mac
+echo.
+
+# Report discovery to api-manager
+echo Registering machine with provisioning server...
+chain $boot_url/boot-event || goto failed
+
+# Boot discovery image
+echo Booting discovery image...
+kernel $boot_url/images/discovery/vmlinuz initrd=initrd ip=dhcp
+initrd $boot_url/images/discovery/initrd
+boot || goto failed
+
+:failed
+echo.
+echo Discovery boot failed. Dropping to iPXE shell.
+echo Type 'reboot' to restart or 'exit' to continue booting.
+shell
+""")
+
+_ERROR_TEMPLATE = string.Template("""#!ipxe
+echo ======================================
+echo Gough Provisioning - Error
+echo ======================================
+echo $error
+echo.
+echo Dropping to iPXE shell.
+echo Type 'reboot' to restart.
+shell
+""")
+
+
+@functools.lru_cache(maxsize=256)
+def _discovery_script(mac: str, boot_url: str) -> str:
+    """Render the discovery script; repeat chainloads reuse the string."""
+    return _DISCOVERY_TEMPLATE.substitute(mac=mac, boot_url=boot_url)
+
+
+# Drops separators and lowercases hex digits in a single pass
+_MAC_TRANS = str.maketrans({":": None, "-": None, **{c: c.lower() for c in "ABCDEF"}})
+
+
+def _normalize_mac(mac: str) -> str:
+    """Normalize MAC address (remove colons, dashes, lowercase)."""
+    return mac.translate(_MAC_TRANS)
+
 
 class IPXEHandler:
     """Handles iPXE script generation and cloud-init data."""
@@ -21,48 +92,111 @@ class IPXEHandler:
         self.config = config
         self.enrollment = enrollment
 
+        # One keep-alive client for all api-manager lookups, so a boot
+        # storm reuses connections instead of reconnecting per request.
+        # Stage timeouts let a stuck connect fail fast.
+        self._client = httpx.AsyncClient(
+            base_url=config.api_manager_url,
+            timeout=httpx.Timeout(connect=2.0, read=10.0, write=5.0, pool=5.0),
+            # http2 and limits belong on the transport; AsyncClient ignores
+            # its own copies when a transport is passed
+            transport=api_transport(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=100, max_connections=1000),
+            ),
+        )
+
+        # Auth headers ride on the client and follow session token changes
+        self._client.headers.update(enrollment.auth_headers)
+        enrollment.add_header_listener(self._client.headers.update)
+
+        # Normalized MAC -> boot script; only successful lookups are cached
+        # so unknown machines keep reaching discovery
+        self._script_cache: TTLCache = TTLCache(
+            maxsize=BOOT_SCRIPT_CACHE_SIZE, ttl=config.boot_script_cache_ttl
+        )
+
+        # Normalized MAC -> in-flight lookup shared by concurrent requests
+        self._inflight: dict[str, asyncio.Task] = {}
+
+        # machine_id -> meta-data; runs uncached if /run is not writable
+        try:
+            self._metadata_cache: Optional[diskcache.Cache] = diskcache.Cache(
+                METADATA_CACHE_DIR, size_limit=METADATA_CACHE_SIZE
+            )
+        except OSError as e:
+            logger.warning("cloud_init_metadata_cache_unavailable", error=str(e))
+            self._metadata_cache = None
+
+    async def aclose(self):
+        """Close the api-manager client and the meta-data cache."""
+        await self._client.aclose()
+        if self._metadata_cache is not None:
+            self._metadata_cache.close()
+
+    async def invalidate(self, mac: Optional[str] = None, machine_id: Optional[str] = None):
+        """Drop cached boot script and meta-data for a machine whose state changed."""
+        if mac:
+            self._script_cache.pop(_normalize_mac(mac), None)
+        if machine_id and self._metadata_cache is not None:
+            await asyncio.to_thread(self._metadata_cache.delete, str(machine_id))
+
     async def generate_script(self, mac: str) -> str:
         """
         Generate iPXE boot script for machine by MAC address.
 
         Queries api-manager for machine state and returns appropriate script.
         """
-        # Normalize MAC address (remove colons, dashes, uppercase)
-        mac_normalized = mac.replace(":", "").replace("-", "").lower()
-
-        # Query api-manager for boot script
-        api_url = f"{self.config.api_manager_url}/api/v1/internal/boot-script/{mac_normalized}"
-        headers = self.enrollment.get_auth_headers()
+        mac_normalized = _normalize_mac(mac)
 
-        try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(api_url, headers=headers)
+        script = self._script_cache.get(mac_normalized)
+        if script is not None:
+            return script
 
-                if response.status_code == 200:
-                    data = response.json()
-                    script = data.get("script", "")
-
-                    logger.info(
-                        "ipxe_script_generated",
-                        mac=mac_normalized,
-                        machine_id=data.get("machine_id"),
-                        status=data.get("status"),
-                    )
+        # Concurrent chainloads for the same MAC share one api-manager
+        # lookup; shield it so one client disconnecting doesn't cancel it
+        # for the others
+        task = self._inflight.get(mac_normalized)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_script(mac_normalized))
+            self._inflight[mac_normalized] = task
+            task.add_done_callback(lambda _: self._inflight.pop(mac_normalized, None))
 
-                    return script
+        return await asyncio.shield(task)
 
-                elif response.status_code == 404:
-                    # Unknown machine - return discovery script
-                    logger.info("unknown_machine_discovered", mac=mac_normalized)
-                    return self._generate_discovery_script(mac_normalized)
+    async def _fetch_script(self, mac_normalized: str) -> str:
+        """Query api-manager for a machine's boot script."""
+        api_path = f"/api/v1/internal/boot-script/{mac_normalized}"
 
-                else:
-                    logger.error(
-                        "boot_script_fetch_failed",
-                        mac=mac_normalized,
-                        status=response.status_code,
-                    )
-                    return self._generate_error_script("API request failed")
+        try:
+            response = await self._client.get(api_path)
+
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                script = data.get("script", "")
+                self._script_cache[mac_normalized] = script
+
+                logger.info(
+                    "ipxe_script_generated",
+                    mac=mac_normalized,
+                    machine_id=data.get("machine_id"),
+                    status=data.get("status"),
+                )
+
+                return script
+
+            elif response.status_code == 404:
+                # Unknown machine - return discovery script
+                logger.info("unknown_machine_discovered", mac=mac_normalized)
+                return self._generate_discovery_script(mac_normalized)
+
+            else:
+                logger.error(
+                    "boot_script_fetch_failed",
+                    mac=mac_normalized,
+                    status=response.status_code,
+                )
+                return self._generate_error_script("API request failed")
 
         except httpx.ConnectError:
             logger.error("api_manager_unreachable", mac=mac_normalized)
@@ -77,48 +211,11 @@ class IPXEHandler:
 
         Boots into a minimal discovery image that reports hardware info.
         """
-        boot_url = self.config.get_boot_url()
-
-        script = f"""#!ipxe
-# Discovery script for new machine: {mac}
-
-echo ======================================
-echo Gough Provisioning - Machine Discovery
-echo ======================================
-echo MAC Address: {mac}
-echo.
-
-# Report discovery to api-manager
-echo Registering machine with provisioning server...
-chain {boot_url}/boot-event || goto failed
-
-# Boot discovery image
-echo Booting discovery image...
-kernel {boot_url}/images/discovery/vmlinuz initrd=initrd ip=dhcp
-initrd {boot_url}/images/discovery/initrd
-boot || goto failed
-
-:failed
-echo.
-echo Discovery boot failed. Dropping to iPXE shell.
-echo Type 'reboot' to restart or 'exit' to continue booting.
-shell
-"""
-        return script
+        return _discovery_script(mac, self.config.get_boot_url())
 
     def _generate_error_script(self, error_message: str) -> str:
         """Generate error iPXE script."""
-        script = f"""#!ipxe
-echo ======================================
-echo Gough Provisioning - Error
-echo ======================================
-echo {error_message}
-echo.
-echo Dropping to iPXE shell.
-echo Type 'reboot' to restart.
-shell
-"""
-        return script
+        return _ERROR_TEMPLATE.substitute(error=error_message)
 
     async def get_cloud_init_metadata(self, machine_id: str) -> str:
         """
@@ -126,50 +223,64 @@ shell
 
         Returns YAML metadata for cloud-init datasource.
         """
-        api_url = f"{self.config.api_manager_url}/api/v1/internal/cloud-init/{machine_id}/meta-data"
-        headers = self.enrollment.get_auth_headers()
+        if self._metadata_cache is not None:
+            # diskcache does blocking SQLite and file I/O
+            metadata = await asyncio.to_thread(self._metadata_cache.get, machine_id)
+            if metadata is not None:
+                return metadata
+
+        api_path = f"/api/v1/internal/cloud-init/{machine_id}/meta-data"
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(api_url, headers=headers)
+            response = await self._client.get(api_path)
 
-                if response.status_code == 200:
-                    return response.text
-                else:
-                    logger.error(
-                        "cloud_init_metadata_fetch_failed",
-                        machine_id=machine_id,
-                        status=response.status_code,
+            if response.status_code == 200:
+                metadata = response.text
+                if self._metadata_cache is not None:
+                    await asyncio.to_thread(
+                        self._metadata_cache.set, machine_id, metadata, expire=METADATA_CACHE_TTL
                     )
-                    return "instance-id: error\nlocal-hostname: unknown\n"
+                return metadata
+            else:
+                logger.error(
+                    "cloud_init_metadata_fetch_failed",
+                    machine_id=machine_id,
+                    status=response.status_code,
+                )
+                return "instance-id: error\nlocal-hostname: unknown\n"
 
         except Exception as e:
             logger.error("cloud_init_metadata_error", machine_id=machine_id, error=str(e))
             return "instance-id: error\nlocal-hostname: unknown\n"
 
-    async def get_cloud_init_userdata(self, machine_id: str) -> str:
+    async def get_cloud_init_userdata(self, machine_id: str) -> AsyncIterator[bytes]:
         """
-        Fetch cloud-init user-data for machine.
+        Stream cloud-init user-data for machine.
 
-        Returns merged cloud-init YAML with all eggs applied.
+        Yields merged cloud-init YAML with all eggs applied as it arrives
+        from api-manager.
         """
-        api_url = f"{self.config.api_manager_url}/api/v1/internal/cloud-init/{machine_id}/user-data"
-        headers = self.enrollment.get_auth_headers()
+        api_path = f"/api/v1/internal/cloud-init/{machine_id}/user-data"
+        streaming = False
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(api_url, headers=headers)
-
+            async with self._client.stream("GET", api_path) as response:
                 if response.status_code == 200:
-                    return response.text
-                else:
-                    logger.error(
-                        "cloud_init_userdata_fetch_failed",
-                        machine_id=machine_id,
-                        status=response.status_code,
-                    )
-                    return "#cloud-config\n# Error fetching user-data\n"
+                    async for chunk in response.aiter_bytes(USERDATA_CHUNK_SIZE):
+                        streaming = True
+                        yield chunk
+                    return
+
+                logger.error(
+                    "cloud_init_userdata_fetch_failed",
+                    machine_id=machine_id,
+                    status=response.status_code,
+                )
 
         except Exception as e:
+            if streaming:
+                # Part of the body is already out; abort rather than append
+                raise
             logger.error("cloud_init_userdata_error", machine_id=machine_id, error=str(e))
-            return "#cloud-config\n# Error fetching user-data\n"
+
+        yield b"#cloud-config\n# Error fetching user-data\n"
@@ -5,10 +5,22 @@ Supports IPMI, Redfish, and Wake-on-LAN for remote power control.
 """
 
 import asyncio
+import httpx
+import orjson
+import shutil
+import socket
+import ssl
 import structlog
-import subprocess
-from typing import Optional, Literal
-from dataclasses import dataclass
+from cachetools import LRUCache
+from typing import Any, Optional, Literal
+from dataclasses import dataclass, field
+
+# In-process IPMI; falls back to shelling out to ipmitool when unavailable
+try:
+    from pyghmi.ipmi import command as ipmi_command
+    PYGHMI_AVAILABLE = True
+except ImportError:
+    PYGHMI_AVAILABLE = False
 
 logger = structlog.get_logger()
 
@@ -16,21 +28,177 @@ PowerAction = Literal["on", "off", "cycle", "reset", "status"]
 PowerState = Literal["on", "off", "unknown"]
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class BMCCredentials:
-    """BMC authentication credentials."""
+    """BMC authentication credentials.
+
+    Hashable so it can key session caches; the password takes part in
+    equality but not in the hash.
+    """
 
     address: str
     username: str
-    password: str
+    password: str = field(hash=False)
     power_type: str  # ipmi, redfish, wol
 
 
+# IPMI sessions kept open per BMC so repeated actions skip the RMCP+ login
+IPMI_SESSION_CACHE_SIZE = 512
+IPMI_TIMEOUT = 30.0
+
+# ipmitool/wakeonlan processes allowed to run at once
+SUBPROCESS_CONCURRENCY = 64
+
+# Redfish clients kept per BMC so repeat calls reuse the TLS session
+REDFISH_CLIENT_CACHE_SIZE = 256
+
+
+def _bmc_ssl_context() -> ssl.SSLContext:
+    """TLS context for BMCs: self-signed certs and legacy cipher suites."""
+    ctx = ssl.create_default_context()
+    ctx.check_hostname = False
+    ctx.verify_mode = ssl.CERT_NONE
+    ctx.set_ciphers("DEFAULT:@SECLEVEL=0")
+    return ctx
+
+
+# Built once and shared by every Redfish client; context setup is costly
+_BMC_SSL_CONTEXT = _bmc_ssl_context()
+
+# Wake-on-LAN magic packet: 6 bytes of FF + 16 repetitions of the MAC
+WOL_PREFIX = b"\xff" * 6
+WOL_ADDRESS = ("255.255.255.255", 9)
+
+# PowerAction -> pyghmi power state ("boot" powers on or resets as needed)
+_PYGHMI_POWER_STATES = {
+    "on": "on",
+    "off": "off",
+    "cycle": "boot",
+    "reset": "reset",
+}
+
+
+class _ClientLRU(LRUCache):
+    """LRU of httpx clients that closes evicted clients in the background."""
+
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize=maxsize)
+        self._closing: set[asyncio.Task] = set()
+
+    def popitem(self):
+        key, client = super().popitem()
+        task = asyncio.ensure_future(client.aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+        return key, client
+
+
 class PowerManager:
     """Manages power operations for bare metal machines."""
 
     def __init__(self):
-        pass
+        # BMCCredentials -> pyghmi Command
+        self._ipmi_sessions: LRUCache = LRUCache(maxsize=IPMI_SESSION_CACHE_SIZE)
+        # BMC address -> Redfish client
+        self._redfish_clients: _ClientLRU = _ClientLRU(maxsize=REDFISH_CLIENT_CACHE_SIZE)
+        # Broadcast socket shared by all Wake-on-LAN sends
+        self._wol_sock: Optional[socket.socket] = None
+
+        # Bound concurrent subprocesses and resolve the tools once; a missing
+        # tool keeps its bare name so exec raises FileNotFoundError as before
+        self._subprocess_slots = asyncio.Semaphore(SUBPROCESS_CONCURRENCY)
+        self._ipmitool = shutil.which("ipmitool") or "ipmitool"
+        self._wakeonlan = shutil.which("wakeonlan") or "wakeonlan"
+
+    async def _run_command(self, cmd: list[str], timeout: float) -> tuple[int, bytes, bytes]:
+        """Run a command and collect its output.
+
+        Raises FileNotFoundError if the binary is missing and
+        asyncio.TimeoutError, after killing the process, on timeout.
+        """
+        async with self._subprocess_slots:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise
+
+            return process.returncode, stdout, stderr
+
+    def _redfish_client(self, address: str) -> httpx.AsyncClient:
+        """Get the pooled Redfish client for a BMC, creating it on first use."""
+        client = self._redfish_clients.get(address)
+        if client is None:
+            # BMCs commonly present self-signed certificates
+            client = httpx.AsyncClient(
+                base_url=f"https://{address}",
+                verify=_BMC_SSL_CONTEXT,
+                http2=True,
+                timeout=httpx.Timeout(30.0, connect=3.0),
+                limits=httpx.Limits(max_keepalive_connections=4, max_connections=8),
+            )
+            self._redfish_clients[address] = client
+        return client
+
+    async def aclose_all(self):
+        """Close all pooled Redfish clients and the Wake-on-LAN socket."""
+        # Swap in an empty cache rather than clear(), which evicts through
+        # popitem and would schedule a second aclose() for every client
+        old, self._redfish_clients = self._redfish_clients, _ClientLRU(
+            maxsize=REDFISH_CLIENT_CACHE_SIZE
+        )
+        await asyncio.gather(
+            *(client.aclose() for client in old.values()),
+            *old._closing,
+            return_exceptions=True,
+        )
+
+        if self._wol_sock:
+            self._wol_sock.close()
+            self._wol_sock = None
+
+    def _get_wol_socket(self) -> socket.socket:
+        """Get the shared UDP broadcast socket, creating it on first use."""
+        if self._wol_sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            self._wol_sock = sock
+        return self._wol_sock
+
+    async def _pyghmi_call(self, credentials: BMCCredentials, method: str, *args, **kwargs) -> Any:
+        """Run a pyghmi Command method on the BMC's cached session.
+
+        pyghmi is blocking, so the login and the call run in a worker
+        thread. A session that errors is dropped and rebuilt on next use.
+        """
+        session = self._ipmi_sessions.get(credentials)
+        try:
+            if session is None:
+                session = await asyncio.wait_for(
+                    asyncio.to_thread(
+                        ipmi_command.Command,
+                        bmc=credentials.address,
+                        userid=credentials.username,
+                        password=credentials.password,
+                    ),
+                    timeout=IPMI_TIMEOUT,
+                )
+                self._ipmi_sessions[credentials] = session
+
+            return await asyncio.wait_for(
+                asyncio.to_thread(getattr(session, method), *args, **kwargs),
+                timeout=IPMI_TIMEOUT,
+            )
+        except Exception:
+            self._ipmi_sessions.pop(credentials, None)
+            raise
 
     async def power_control(
         self,
@@ -52,6 +220,35 @@ class PowerManager:
         else:
             return False, f"Unsupported power type: {credentials.power_type}"
 
+    async def power_control_many(
+        self,
+        jobs: list[tuple[BMCCredentials, PowerAction]],
+        max_concurrency: int = 50,
+    ) -> list[tuple[bool, str]]:
+        """
+        Execute power control actions on many machines concurrently.
+
+        At most max_concurrency actions run at once to avoid overloading
+        the BMCs and the process table.
+
+        Returns:
+            (success: bool, message: str) per job, in input order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(credentials: BMCCredentials, action: PowerAction) -> tuple[bool, str]:
+            async with semaphore:
+                return await self.power_control(credentials, action)
+
+        results = await asyncio.gather(
+            *(run_one(credentials, action) for credentials, action in jobs),
+            return_exceptions=True,
+        )
+        return [
+            (False, str(result)) if isinstance(result, Exception) else result
+            for result in results
+        ]
+
     async def _ipmi_control(
         self,
         credentials: BMCCredentials,
@@ -71,9 +268,12 @@ class PowerManager:
         if not ipmi_cmd:
             return False, f"Invalid IPMI action: {action}"
 
+        if PYGHMI_AVAILABLE:
+            return await self._pyghmi_power(credentials, action)
+
         # Build ipmitool command
         cmd = [
-            "ipmitool",
+            self._ipmitool,
             "-I", "lanplus",
             "-H", credentials.address,
             "-U", credentials.username,
@@ -88,18 +288,9 @@ class PowerManager:
                 action=action,
             )
 
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=30.0,
-            )
+            returncode, stdout, stderr = await self._run_command(cmd, timeout=30.0)
 
-            if process.returncode == 0:
+            if returncode == 0:
                 output = stdout.decode("utf-8", errors="ignore").strip()
                 logger.info(
                     "ipmi_command_success",
@@ -137,14 +328,56 @@ class PowerManager:
             )
             return False, str(e)
 
+    async def _pyghmi_power(
+        self,
+        credentials: BMCCredentials,
+        action: PowerAction,
+    ) -> tuple[bool, str]:
+        """Execute IPMI power control in-process via pyghmi."""
+        try:
+            logger.info(
+                "ipmi_command_executing",
+                address=credentials.address,
+                action=action,
+            )
+
+            if action == "status":
+                result = await self._pyghmi_call(credentials, "get_power")
+                output = f"Chassis Power is {result.get('powerstate', 'unknown')}"
+            else:
+                await self._pyghmi_call(credentials, "set_power", _PYGHMI_POWER_STATES[action])
+                output = f"Chassis Power Control: {action}"
+
+            logger.info(
+                "ipmi_command_success",
+                address=credentials.address,
+                action=action,
+                output=output,
+            )
+            return True, output
+
+        except asyncio.TimeoutError:
+            logger.error(
+                "ipmi_command_timeout",
+                address=credentials.address,
+                action=action,
+            )
+            return False, "IPMI command timeout"
+        except Exception as e:
+            logger.error(
+                "ipmi_command_failed",
+                address=credentials.address,
+                action=action,
+                error=str(e),
+            )
+            return False, str(e)
+
     async def _redfish_control(
         self,
         credentials: BMCCredentials,
         action: PowerAction,
     ) -> tuple[bool, str]:
         """Execute Redfish power control via REST API."""
-        import httpx
-
         # Map actions to Redfish reset types
         action_map = {
             "on": "On",
@@ -160,7 +393,7 @@ class PowerManager:
             return False, f"Invalid Redfish action: {action}"
 
         # Redfish API endpoint
-        redfish_url = f"https://{credentials.address}/redfish/v1/Systems/1/Actions/ComputerSystem.Reset"
+        redfish_path = "/redfish/v1/Systems/1/Actions/ComputerSystem.Reset"
 
         payload = {"ResetType": reset_type}
 
@@ -171,29 +404,29 @@ class PowerManager:
                 action=action,
             )
 
-            async with httpx.AsyncClient(verify=False, timeout=30.0) as client:
-                response = await client.post(
-                    redfish_url,
-                    json=payload,
-                    auth=(credentials.username, credentials.password),
-                )
+            client = self._redfish_client(credentials.address)
+            response = await client.post(
+                redfish_path,
+                json=payload,
+                auth=(credentials.username, credentials.password),
+            )
 
-                if response.status_code in [200, 202, 204]:
-                    logger.info(
-                        "redfish_command_success",
-                        address=credentials.address,
-                        action=action,
-                    )
-                    return True, f"Redfish {action} successful"
-                else:
-                    logger.error(
-                        "redfish_command_failed",
-                        address=credentials.address,
-                        action=action,
-                        status=response.status_code,
-                        response=response.text,
-                    )
-                    return False, f"Redfish error: {response.status_code}"
+            if response.status_code in [200, 202, 204]:
+                logger.info(
+                    "redfish_command_success",
+                    address=credentials.address,
+                    action=action,
+                )
+                return True, f"Redfish {action} successful"
+            else:
+                logger.error(
+                    "redfish_command_failed",
+                    address=credentials.address,
+                    action=action,
+                    status=response.status_code,
+                    response=response.text,
+                )
+                return False, f"Redfish error: {response.status_code}"
 
         except Exception as e:
             logger.error(
@@ -209,23 +442,20 @@ class PowerManager:
         credentials: BMCCredentials,
     ) -> tuple[bool, str]:
         """Get power status via Redfish."""
-        import httpx
-
-        redfish_url = f"https://{credentials.address}/redfish/v1/Systems/1"
-
         try:
-            async with httpx.AsyncClient(verify=False, timeout=10.0) as client:
-                response = await client.get(
-                    redfish_url,
-                    auth=(credentials.username, credentials.password),
-                )
+            client = self._redfish_client(credentials.address)
+            response = await client.get(
+                "/redfish/v1/Systems/1",
+                auth=(credentials.username, credentials.password),
+                timeout=10.0,
+            )
 
-                if response.status_code == 200:
-                    data = response.json()
-                    power_state = data.get("PowerState", "Unknown")
-                    return True, power_state
-                else:
-                    return False, f"Status check failed: {response.status_code}"
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                power_state = data.get("PowerState", "Unknown")
+                return True, power_state
+            else:
+                return False, f"Status check failed: {response.status_code}"
 
         except Exception as e:
             return False, str(e)
@@ -248,17 +478,11 @@ class PowerManager:
 
         try:
             # Send magic packet using wakeonlan utility or manual implementation
-            cmd = ["wakeonlan", mac_address]
-
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
+            cmd = [self._wakeonlan, mac_address]
 
-            await asyncio.wait_for(process.communicate(), timeout=5.0)
+            returncode, _, _ = await self._run_command(cmd, timeout=5.0)
 
-            if process.returncode == 0:
+            if returncode == 0:
                 logger.info("wol_packet_sent", mac=mac_address)
                 return True, "Wake-on-LAN packet sent"
             else:
@@ -273,27 +497,35 @@ class PowerManager:
 
     async def _send_wol_manual(self, mac_address: str) -> tuple[bool, str]:
         """Send Wake-on-LAN magic packet manually."""
-        import socket
+        return (await self.send_wol_bulk([mac_address]))[0]
 
-        try:
-            # Parse MAC address
-            mac_bytes = bytes.fromhex(mac_address.replace(":", "").replace("-", ""))
+    async def send_wol_bulk(self, mac_addresses: list[str]) -> list[tuple[bool, str]]:
+        """
+        Send Wake-on-LAN magic packets to many machines.
 
-            # Build magic packet (6 bytes of FF + 16 repetitions of MAC)
-            magic_packet = b"\xff" * 6 + mac_bytes * 16
+        All packets go out over the one shared broadcast socket.
 
-            # Send UDP broadcast
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-            sock.sendto(magic_packet, ("255.255.255.255", 9))
-            sock.close()
+        Returns:
+            (success, message) per MAC address, in input order
+        """
+        sock = self._get_wol_socket()
+        results = []
 
-            logger.info("wol_magic_packet_sent", mac=mac_address)
-            return True, "Wake-on-LAN magic packet sent"
+        for mac_address in mac_addresses:
+            try:
+                # Parse MAC address
+                mac_bytes = bytes.fromhex(mac_address.replace(":", "").replace("-", ""))
 
-        except Exception as e:
-            logger.error("wol_manual_error", mac=mac_address, error=str(e))
-            return False, str(e)
+                sock.sendto(WOL_PREFIX + mac_bytes * 16, WOL_ADDRESS)
+
+                logger.info("wol_magic_packet_sent", mac=mac_address)
+                results.append((True, "Wake-on-LAN magic packet sent"))
+
+            except Exception as e:
+                logger.error("wol_manual_error", mac=mac_address, error=str(e))
+                results.append((False, str(e)))
+
+        return results
 
     async def set_boot_device(
         self,
@@ -323,10 +555,13 @@ class PowerManager:
         if not ipmi_device:
             return False, f"Invalid boot device: {device}"
 
+        if PYGHMI_AVAILABLE:
+            return await self._pyghmi_boot_device(credentials, device, persistent)
+
         # Build ipmitool command
         persistence = "persistent" if persistent else "options=efiboot"
         cmd = [
-            "ipmitool",
+            self._ipmitool,
             "-I", "lanplus",
             "-H", credentials.address,
             "-U", credentials.username,
@@ -342,18 +577,9 @@ class PowerManager:
                 persistent=persistent,
             )
 
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=30.0,
-            )
+            returncode, stdout, stderr = await self._run_command(cmd, timeout=30.0)
 
-            if process.returncode == 0:
+            if returncode == 0:
                 logger.info(
                     "ipmi_boot_device_set",
                     address=credentials.address,
@@ -371,3 +597,51 @@ class PowerManager:
                 error=str(e),
             )
             return False, str(e)
+
+    async def _pyghmi_boot_device(
+        self,
+        credentials: BMCCredentials,
+        device: Literal["pxe", "disk", "bios"],
+        persistent: bool,
+    ) -> tuple[bool, str]:
+        """Set next boot device in-process via pyghmi."""
+        # pyghmi device names; one-time overrides request UEFI boot, as
+        # with ipmitool's options=efiboot
+        pyghmi_devices = {
+            "pxe": "network",
+            "disk": "hd",
+            "bios": "setup",
+        }
+
+        try:
+            logger.info(
+                "ipmi_set_boot_device",
+                address=credentials.address,
+                device=device,
+                persistent=persistent,
+            )
+
+            result = await self._pyghmi_call(
+                credentials,
+                "set_bootdev",
+                pyghmi_devices[device],
+                persist=persistent,
+                uefiboot=not persistent,
+            )
+            if isinstance(result, dict) and "error" in result:
+                return False, result["error"]
+
+            logger.info(
+                "ipmi_boot_device_set",
+                address=credentials.address,
+                device=device,
+            )
+            return True, f"Boot device set to {device}"
+
+        except Exception as e:
+            logger.error(
+                "ipmi_boot_device_error",
+                address=credentials.address,
+                error=str(e),
+            )
+            return False, str(e)
@@ -5,24 +5,198 @@ Serves undionly.kpxe (BIOS) and ipxe.efi (UEFI) from local filesystem.
 """
 
 import asyncio
+import os
 import structlog
+from cachetools import TTLCache
 from pathlib import Path
+from typing import Optional
 from py3tftp.protocols import TFTPServerProtocol
 from py3tftp.file_io import FileReader
+from py3tftp.netascii import Netascii
 
 from worker.config import WorkerConfig
+from worker.services.ipxe_handler import IPXEHandler
 
 logger = structlog.get_logger()
 
+ARP_TABLE = "/proc/net/arp"
+TFTP_OPCODE_RRQ = b"\x00\x01"
+
+# Resolved client MACs; neighbours rarely change address within a boot
+ARP_CACHE_SIZE = 1024
+ARP_CACHE_TTL = 60
+
+
+def _arp_lookup(ip: str) -> Optional[str]:
+    """Resolve a neighbour's MAC address from the kernel ARP table."""
+    try:
+        with open(ARP_TABLE) as f:
+            next(f)  # Header
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 4 and fields[0] == ip:
+                    mac = fields[3]
+                    return None if mac == "00:00:00:00:00:00" else mac
+    except (OSError, StopIteration):
+        pass
+    return None
+
+
+# Files up to this size are served from memory; larger ones stream from disk
+MAX_CACHED_FILE_SIZE = 32 * 1024 * 1024
+
+
+class _CachedFile:
+    """File-like reader over shared cached contents, with its own offset."""
+
+    __slots__ = ("_data", "_pos", "closed")
+
+    def __init__(self, data: bytes):
+        self._data = data
+        self._pos = 0
+        self.closed = False
+
+    def read(self, size: int = -1) -> bytes:
+        start = self._pos
+        end = len(self._data) if size is None or size < 0 else start + size
+        chunk = self._data[start:end]
+        self._pos = start + len(chunk)
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+class CachedFileReader(FileReader):
+    """FileReader that serves files from a shared in-memory cache.
+
+    Every PXE client fetches the same boot binaries, so each file is read
+    once and reloaded only when its inode, size or mtime changes. The
+    contents are copied rather than mmapped so a binary rewritten in place
+    cannot fault transfers that are still reading it.
+    """
+
+    _contents: dict[Path, tuple[tuple[int, int, int], bytes]] = {}
+
+    def __init__(self, fname, chunk_size=0, mode=None, root: Optional[Path] = None):
+        # FileReader resolves names under the process cwd; resolve them under
+        # the TFTP root instead
+        self._f = None
+        self.fname = self._resolve(fname, Path(root) if root else Path.cwd())
+        self.chunk_size = chunk_size
+        self._f = self._open_file()
+        self.finished = False
+
+        if mode == b"netascii":
+            self._f = Netascii(self._f)
+
+    @staticmethod
+    def _resolve(fname, root: Path) -> Path:
+        """Resolve a requested name to a file inside ``root``.
+
+        Absolute names, ``..`` segments and symlinks that lead outside the
+        root, and reserved names all raise FileNotFoundError.
+        """
+        name = os.fsdecode(fname)
+        if os.path.isabs(name):
+            raise FileNotFoundError(name)
+
+        root = root.resolve()
+        path = (root / name).resolve()
+        if not path.is_relative_to(root) or path.is_reserved():
+            raise FileNotFoundError(name)
+        return path
+
+    def _open_file(self):
+        st = self.fname.stat()
+        self._size = st.st_size
+        if st.st_size > MAX_CACHED_FILE_SIZE:
+            return super()._open_file()
+
+        version = (st.st_ino, st.st_size, st.st_mtime_ns)
+        cached = self._contents.get(self.fname)
+        if cached is not None and cached[0] == version:
+            data = cached[1]
+        else:
+            data = self.fname.read_bytes()
+            self._contents[self.fname] = (version, data)
+
+        return _CachedFile(data)
+
+    def file_size(self):
+        return self._size
+
+
+class BootFileTFTPServerProtocol(TFTPServerProtocol):
+    """Read-only TFTP server protocol serving cached files from a root directory."""
+
+    def __init__(self, host_interface, loop, extra_opts, root: Path):
+        super().__init__(host_interface, loop, extra_opts)
+        self.root = root
+
+    def select_file_handler(self, packet):
+        if packet.is_rrq():
+            return lambda filename, opts: CachedFileReader(
+                filename, opts, packet.mode, root=self.root
+            )
+        return self._reject_write
+
+    @staticmethod
+    def _reject_write(filename, opts):
+        raise PermissionError(f"TFTP root is read-only: {filename!r}")
+
+
+class PrefetchingTFTPServerProtocol(BootFileTFTPServerProtocol):
+    """TFTP server protocol that warms the boot-script cache on each RRQ.
+
+    A machine fetching the iPXE binary asks for its boot script over HTTP
+    shortly after, so the api-manager lookup is started while the binary
+    is still transferring.
+    """
+
+    def __init__(
+        self,
+        host_interface,
+        loop,
+        extra_opts,
+        root: Path,
+        ipxe_handler: Optional[IPXEHandler] = None,
+    ):
+        super().__init__(host_interface, loop, extra_opts, root)
+        self.ipxe_handler = ipxe_handler
+        self._arp_cache: TTLCache = TTLCache(maxsize=ARP_CACHE_SIZE, ttl=ARP_CACHE_TTL)
+        self._prefetches: set[asyncio.Task] = set()
+
+    def datagram_received(self, data, addr):
+        if self.ipxe_handler and data[:2] == TFTP_OPCODE_RRQ:
+            task = self.loop.create_task(self._prefetch_script(addr[0]))
+            self._prefetches.add(task)
+            task.add_done_callback(self._prefetches.discard)
+        super().datagram_received(data, addr)
+
+    async def _prefetch_script(self, client_ip: str):
+        mac = self._arp_cache.get(client_ip)
+        if mac is None:
+            # /proc/net/arp is a file read; keep it off the event loop
+            mac = await asyncio.to_thread(_arp_lookup, client_ip)
+            if not mac:
+                return
+            self._arp_cache[client_ip] = mac
+
+        logger.debug("tftp_boot_script_prefetch", client=client_ip, mac=mac)
+        await self.ipxe_handler.generate_script(mac)
+
 
 class TFTPServer:
     """TFTP server for iPXE binaries."""
 
-    def __init__(self, config: WorkerConfig):
+    def __init__(self, config: WorkerConfig, ipxe_handler: Optional[IPXEHandler] = None):
         self.config = config
+        self.ipxe_handler = ipxe_handler
         self.running = False
         self.transport = None
         self.protocol = None
+        self._stopped = asyncio.Event()
 
     async def start(self):
         """Start TFTP server."""
@@ -44,9 +218,12 @@ class TFTPServer:
                 logger.info("tftp_file_found", file=filename, size=file_path.stat().st_size)
 
         # Create TFTP protocol
-        self.protocol = TFTPServerProtocol(
-            file_handler_cls=FileReader,
-            root_path=str(tftp_root),
+        self.protocol = PrefetchingTFTPServerProtocol(
+            "0.0.0.0",
+            loop,
+            {},
+            root=tftp_root,
+            ipxe_handler=self.ipxe_handler,
         )
 
         # Start UDP server
@@ -62,9 +239,8 @@ class TFTPServer:
                 root=str(tftp_root),
             )
 
-            # Keep running until stopped
-            while self.running:
-                await asyncio.sleep(1)
+            # Keep running until stop() is called
+            await self._stopped.wait()
 
         except Exception as e:
             logger.error("tftp_server_error", error=str(e))
@@ -73,6 +249,7 @@ class TFTPServer:
     async def stop(self):
         """Stop TFTP server."""
         self.running = False
+        self._stopped.set()
         if self.transport:
             self.transport.close()
             logger.info("tftp_server_stopped")
@@ -0,0 +1,23 @@
+"""
+HTTP client helpers for talking to api-manager.
+
+Heartbeats, enrollment and boot-script lookups are small request/response
+exchanges, so sockets are tuned to send them without Nagle delay.
+"""
+
+import socket
+
+import httpx
+
+# Socket options applied to every connection opened towards api-manager
+API_SOCKET_OPTIONS: list[tuple[int, int, int]] = [
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+]
+if hasattr(socket, "TCP_QUICKACK"):  # Linux only
+    API_SOCKET_OPTIONS.append((socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1))
+
+
+def api_transport(**kwargs) -> httpx.AsyncHTTPTransport:
+    """Build an async transport with api-manager socket tuning applied."""
+    return httpx.AsyncHTTPTransport(socket_options=API_SOCKET_OPTIONS, **kwargs)
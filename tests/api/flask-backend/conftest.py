@@ -1,17 +1,27 @@
 """Pytest fixtures for Flask backend API tests."""
 
+import collections
+import contextlib
+import functools
 import json
-from datetime import datetime
-from unittest.mock import Mock, patch
+import uuid
+from datetime import datetime, timedelta
 
+import bcrypt
 import pytest
-from flask import Flask
-from flask_security import Security
 
 from gough.services.flask_backend.app import create_app
+from gough.services.flask_backend.app.auth import create_access_token
 from gough.services.flask_backend.app.config import Config
 from gough.services.flask_backend.app.models import get_db
-from gough.services.flask_backend.app.security_datastore import PyDALUserDatastore
+
+
+# Skip journaling and fsync; the database is discarded after the run
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+)
 
 
 class TestConfig(Config):
@@ -19,253 +29,331 @@ class TestConfig(Config):
 
     TESTING = True
     DEBUG = True
+    DB_TYPE = "sqlite"
+    DB_NAME = ":memory:"
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     WTF_CSRF_ENABLED = False
     SECRET_KEY = "test-secret-key-do-not-use-in-production"
     JWT_SECRET = "test-jwt-secret-do-not-use-in-production"
     SECURITY_PASSWORD_SALT = "test-salt-do-not-use-in-production"
 
+    # Disable rate limiting and audit logging for tests
+    RATE_LIMIT_ENABLED = False
+    AUDIT_ENABLED = False
+
+    # Tokens minted once per session must outlive the run
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=365)
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=365)
+    SECURITY_TOKEN_MAX_AGE = None
+
+
+# Modules whose get_db the tests exercise; each imports the name directly,
+# so each is patched to return the session's handle without the g lookup
+GET_DB_MODULES = (
+    "gough.services.flask_backend.app.models",
+    "gough.services.flask_backend.app.api.shell",
+    "gough.services.flask_backend.app.api.teams",
+)
+
+# Tables written by tests, children first; emptied after each test so the
+# schema and roles built once per session are reused
+PER_TEST_TABLES = (
+    "shell_sessions",
+    "team_members",
+    "resource_assignments",
+    "resource_teams",
+    "access_agents",
+    "auth_user_roles",
+    "auth_user",
+)
+
+# Row ids, per table, created by session- and class-scoped fixtures;
+# per-test cleanup leaves these rows in place
+_SHARED_ROW_IDS = collections.defaultdict(set)
+
+
+def _get_or_create_role(db, name, description, permissions):
+    """Look up a role by name, creating it if missing."""
+    role = db(db.auth_role.name == name).select().first()
+    if not role:
+        db.auth_role.insert(
+            name=name,
+            description=description,
+            permissions=json.dumps(permissions)
+        )
+        db.commit()
+        role = db(db.auth_role.name == name).select().first()
+    return role
+
+
+@functools.lru_cache(maxsize=None)
+def _password_hash(password):
+    """Hash a test password once per session, at bcrypt's minimum cost.
+
+    Login checks still run through bcrypt, but against a cheap hash.
+    """
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("utf-8")
+
+
+def _make_user(db, email, password, role):
+    """Create an active user holding one role, committing once."""
+    now = datetime.utcnow()
+    user_id = db.auth_user.insert(
+        email=email,
+        password=_password_hash(password),
+        active=True,
+        confirmed_at=now,
+        fs_uniquifier=str(uuid.uuid4()),
+        created_at=now,
+        updated_at=now,
+        login_count=0
+    )
+    db.auth_user_roles.insert(user_id=user_id, role_id=role.id)
+    db.commit()
+
+    return db.auth_user(user_id)
+
+
+def _user_rows(db, user):
+    """Row ids for a user created by _make_user, keyed by table."""
+    links = db(db.auth_user_roles.user_id == user.id).select(db.auth_user_roles.id)
+    return {"auth_user_roles": {link.id for link in links}, "auth_user": {user.id}}
+
+
+@contextlib.contextmanager
+def _shared_rows(db, rows):
+    """Keep rows through per-test cleanup, deleting them on exit.
+
+    ``rows`` maps table names from PER_TEST_TABLES to row ids.
+    """
+    for table, ids in rows.items():
+        _SHARED_ROW_IDS[table].update(ids)
+    try:
+        yield
+    finally:
+        db.rollback()
+        for table in PER_TEST_TABLES:
+            ids = rows.get(table)
+            if ids:
+                _SHARED_ROW_IDS[table].difference_update(ids)
+                db(db[table].id.belongs(ids)).delete()
+        db.commit()
 
-@pytest.fixture(scope="function")
+
+@pytest.fixture(scope="session")
 def app():
-    """Create and configure a test Flask application."""
+    """Create and configure a test Flask application for the session."""
     app = create_app(TestConfig)
 
     with app.app_context():
-        yield app
+        shared_db = get_db()
+        for pragma in SQLITE_PRAGMAS:
+            shared_db.executesql(pragma)
+
+        with pytest.MonkeyPatch.context() as mp:
+            for module in GET_DB_MODULES:
+                mp.setattr(f"{module}.get_db", lambda: shared_db)
+            yield app
 
 
 @pytest.fixture(scope="function")
-def client(app):
-    """Create a test client."""
-    return app.test_client()
+def db_session(app):
+    """Database handle whose per-test writes are discarded on teardown.
 
+    Uncommitted writes are rolled back and rows committed during the test
+    are cleared from PER_TEST_TABLES, leaving the schema in place.
+    """
+    db = get_db()
 
-@pytest.fixture(scope="function")
-def auth_headers(app, client):
-    """Create authentication headers with a test user."""
-    with app.app_context():
-        db = get_db()
-        user_datastore = app.user_datastore
-
-        # Create default admin role if it doesn't exist
-        if not db(db.auth_role.name == "admin").select().first():
-            db.auth_role.insert(
-                name="admin",
-                description="Administrator",
-                permissions=json.dumps(["all"])
-            )
-            db.commit()
-
-        # Create test user
-        test_email = "testuser@example.com"
-        test_password = "SecurePassword123!"
-
-        # Clean up any existing test user
-        db(db.auth_user.email == test_email).delete()
-        db.commit()
+    yield db
 
-        # Create user
-        user = user_datastore.create_user(
-            email=test_email,
-            password=test_password,
-            active=True,
-            confirmed_at=datetime.utcnow()
-        )
-        db.commit()
+    db.rollback()
+    for table in PER_TEST_TABLES:
+        query = db[table].id > 0
+        shared = _SHARED_ROW_IDS[table]
+        if shared:
+            query &= ~db[table].id.belongs(shared)
+        db(query).delete()
+    db.commit()
 
-        # Assign admin role
-        admin_role = db(db.auth_role.name == "admin").select().first()
-        if admin_role:
-            db.auth_user_roles.insert(
-                user_id=user.id,
-                role_id=admin_role.id
-            )
-            db.commit()
-
-    # Login and get token
-    response = client.post(
-        "/api/v1/auth/login",
-        json={"email": test_email, "password": test_password},
-        content_type="application/json"
-    )
 
-    if response.status_code == 200:
-        data = response.get_json()
-        token = data.get("token") or data.get("access_token")
-        return {"Authorization": f"Bearer {token}"}
+@pytest.fixture(scope="session")
+def admin_role(app):
+    """Admin role, created once per session."""
+    return _get_or_create_role(get_db(), "admin", "Administrator", ["all"])
 
-    # Fallback if login fails
-    return {"Authorization": "Bearer test-token"}
 
+@pytest.fixture(scope="session")
+def viewer_role(app):
+    """Viewer role, created once per session."""
+    return _get_or_create_role(get_db(), "viewer", "Viewer", ["read"])
 
-@pytest.fixture(scope="function")
-def mock_agent(app):
-    """Create a mock access agent."""
-    with app.app_context():
-        db = get_db()
-
-        agent = db.access_agents.insert(
-            agent_id="test-agent-001",
-            hostname="test-agent.local",
-            ip_address="192.168.1.100",
-            status="active",
-            capabilities=json.dumps(["ssh", "kubectl", "docker", "cloud_cli"]),
-            last_heartbeat=datetime.utcnow()
-        )
-        db.commit()
 
-        return agent
+@pytest.fixture(scope="session")
+def shared_client(app):
+    """Test client shared by the whole session."""
+    return app.test_client()
 
 
-@pytest.fixture(scope="function")
-def mock_resource(app):
-    """Create a mock resource for testing."""
-    with app.app_context():
-        db = get_db()
+@pytest.fixture(scope="session")
+def session_auth_headers(app, admin_role):
+    """Authentication headers for an admin user, minted once per session.
 
-        # Create a team
-        team = db.resource_teams.insert(
-            name="test-team",
-            description="Test team for shell sessions",
-            created_by=1
-        )
+    The token is signed directly rather than obtained by logging in, so no
+    password is checked.
+    """
+    db = get_db()
+    user = _make_user(db, "sessionuser@example.com", "SessionPassword123!", admin_role)
+    for table, ids in _user_rows(db, user).items():
+        _SHARED_ROW_IDS[table].update(ids)
 
-        # Create resource assignment with shell permission
-        assignment = db.resource_assignments.insert(
-            team_id=team,
-            resource_type="vm",
-            resource_id="test-vm-001",
-            permissions=json.dumps(["shell", "read", "write"]),
-            assigned_by=1
-        )
+    return {"Authorization": f"Bearer {create_access_token(user.id, 'admin')}"}
 
-        db.commit()
 
-        return {
-            "team_id": team,
-            "resource_type": "vm",
-            "resource_id": "test-vm-001"
-        }
+@pytest.fixture(scope="session")
+def shared_admin_user(app, admin_role):
+    """Admin user created once per session and kept through per-test cleanup."""
+    db = get_db()
+    user = _make_user(db, "admin@test.local", "admin123", admin_role)
+    with _shared_rows(db, _user_rows(db, user)):
+        yield user
+
+
+@pytest.fixture(scope="session")
+def shared_regular_user(app, viewer_role):
+    """Regular user created once per session and kept through per-test cleanup."""
+    db = get_db()
+    user = _make_user(db, "user@test.local", "user123", viewer_role)
+    with _shared_rows(db, _user_rows(db, user)):
+        yield user
 
 
 @pytest.fixture(scope="function")
-def admin_user(app):
-    """Create an admin user."""
-    with app.app_context():
-        db = get_db()
-        user_datastore = app.user_datastore
-
-        # Create admin role if needed
-        admin_role = db(db.auth_role.name == "admin").select().first()
-        if not admin_role:
-            admin_role = db.auth_role.insert(
-                name="admin",
-                description="Administrator",
-                permissions=json.dumps(["all"])
-            )
-            db.commit()
-
-        admin_email = "admin@example.com"
-
-        # Clean up any existing admin user
-        db(db.auth_user.email == admin_email).delete()
-        db.commit()
+def client(shared_client, db_session):
+    """Session test client, with this test's database writes discarded."""
+    return shared_client
 
-        # Create admin user
-        admin = user_datastore.create_user(
-            email=admin_email,
-            password="AdminPassword123!",
-            active=True,
-            confirmed_at=datetime.utcnow()
-        )
 
-        # Assign admin role
-        db.auth_user_roles.insert(
-            user_id=admin.id,
-            role_id=admin_role.id
-        )
+@pytest.fixture(scope="function")
+def auth_headers(session_auth_headers, db_session):
+    """Admin authentication headers from the once-per-session login."""
+    return session_auth_headers
+
+
+@pytest.fixture(scope="session")
+def registered_agent(app):
+    """Create a mock access agent, registered once for the whole session."""
+    db = get_db()
+
+    agent = db.access_agents.insert(
+        agent_id="test-agent-001",
+        hostname="test-agent.local",
+        ip_address="192.168.1.100",
+        status="active",
+        capabilities=json.dumps(["ssh", "kubectl", "docker", "cloud_cli"]),
+        last_heartbeat=datetime.utcnow()
+    )
+    db.commit()
 
-        db.commit()
+    with _shared_rows(db, {"access_agents": {agent}}):
+        yield agent
 
-        return admin
+
+@pytest.fixture(scope="function")
+def mock_agent(registered_agent):
+    """Active access agent for tests that create sessions."""
+    return registered_agent
 
 
 @pytest.fixture(scope="function")
-def regular_user(app):
-    """Create a regular (non-admin) user."""
-    with app.app_context():
-        db = get_db()
-        user_datastore = app.user_datastore
-
-        # Create viewer role if needed
-        viewer_role = db(db.auth_role.name == "viewer").select().first()
-        if not viewer_role:
-            viewer_role = db.auth_role.insert(
-                name="viewer",
-                description="Viewer",
-                permissions=json.dumps(["read"])
-            )
-            db.commit()
-
-        user_email = "regularuser@example.com"
-
-        # Clean up any existing user
-        db(db.auth_user.email == user_email).delete()
-        db.commit()
+def no_active_agents(db_session):
+    """Suspend every access agent for one test; rolled back on teardown."""
+    db_session(db_session.access_agents.status == "active").update(status="suspended")
+    yield
 
-        # Create user
-        user = user_datastore.create_user(
-            email=user_email,
-            password="UserPassword123!",
-            active=True,
-            confirmed_at=datetime.utcnow()
-        )
 
-        # Assign viewer role
-        db.auth_user_roles.insert(
-            user_id=user.id,
-            role_id=viewer_role.id
-        )
+@pytest.fixture(scope="function")
+def mock_resource(db_session):
+    """Create a mock resource for testing."""
+    db = db_session
 
-        db.commit()
+    # Create a team
+    team = db.resource_teams.insert(
+        name="test-team",
+        description="Test team for shell sessions",
+        created_by=1
+    )
+
+    # Create resource assignment with shell permission
+    assignment = db.resource_assignments.insert(
+        team_id=team,
+        resource_type="vm",
+        resource_id="test-vm-001",
+        permissions=json.dumps(["shell", "read", "write"]),
+        assigned_by=1
+    )
 
-        return user
+    db.commit()
+
+    return {
+        "team_id": team,
+        "resource_type": "vm",
+        "resource_id": "test-vm-001"
+    }
 
 
 @pytest.fixture(scope="function")
-def team_with_shell_access(app, admin_user):
-    """Create a team with shell access to a resource."""
-    with app.app_context():
-        db = get_db()
+def admin_user(db_session, admin_role):
+    """Create an admin user."""
+    return _make_user(db_session, "admin@example.com", "AdminPassword123!", admin_role)
 
-        # Create team
-        team = db.resource_teams.insert(
-            name="shell-access-team",
-            description="Team with shell access",
-            created_by=admin_user.id
-        )
 
-        # Add admin user to team
-        db.team_members.insert(
-            team_id=team,
-            user_id=admin_user.id,
-            role="owner",
-            added_by=admin_user.id
-        )
+@pytest.fixture(scope="function")
+def regular_user(db_session, viewer_role):
+    """Create a regular (non-admin) user."""
+    return _make_user(db_session, "regularuser@example.com", "UserPassword123!", viewer_role)
 
-        # Create resource assignment with shell permission
-        db.resource_assignments.insert(
-            team_id=team,
-            resource_type="vm",
-            resource_id="shell-test-vm",
-            permissions=json.dumps(["shell", "read"]),
-            assigned_by=admin_user.id
-        )
 
-        db.commit()
+@pytest.fixture(scope="class")
+def team_with_shell_access(app, admin_role):
+    """Create a team with shell access to a resource, shared by a test class."""
+    db = get_db()
+    owner = _make_user(db, "teamowner@example.com", "OwnerPassword123!", admin_role)
 
-        return {
+    # Create team
+    team = db.resource_teams.insert(
+        name="shell-access-team",
+        description="Team with shell access",
+        created_by=owner.id
+    )
+
+    # Add owner to team
+    member = db.team_members.insert(
+        team_id=team,
+        user_id=owner.id,
+        role="owner",
+        added_by=owner.id
+    )
+
+    # Create resource assignment with shell permission
+    assignment = db.resource_assignments.insert(
+        team_id=team,
+        resource_type="vm",
+        resource_id="shell-test-vm",
+        permissions=json.dumps(["shell", "read"]),
+        assigned_by=owner.id
+    )
+
+    db.commit()
+
+    rows = _user_rows(db, owner)
+    rows.update(
+        resource_teams={team},
+        team_members={member},
+        resource_assignments={assignment},
+    )
+    with _shared_rows(db, rows):
+        yield {
             "team_id": team,
             "resource_type": "vm",
             "resource_id": "shell-test-vm"
@@ -9,99 +9,285 @@ This module tests the /api/v1/agents blueprint including:
 - Agent management operations (list, suspend)
 
 Test cases cover both success and error scenarios.
+
+Shared fixtures are read-only and the stub client is reset between tests,
+so the module is safe to run in parallel:
+
+    pytest -n auto -m agent tests/api/flask-backend/test_agents.py
 """
 
-import json
-import time
-from datetime import datetime, timedelta
-from unittest.mock import Mock, patch, MagicMock
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType, SimpleNamespace
 
 import pytest
 import jwt
 
+pytestmark = pytest.mark.agent
+
+# Timestamps for mocked responses and token expiry, computed once; the
+# responses are canned, so drift over a run doesn't matter
+_NOW = datetime.now(timezone.utc).replace(tzinfo=None)
+_ISO_NOW = _NOW.isoformat()
+_ISO_PLUS_1H = (_NOW + timedelta(hours=1)).isoformat()
+_ISO_PLUS_24H = (_NOW + timedelta(hours=24)).isoformat()
+_ISO_PAST_1H = (_NOW - timedelta(hours=1)).isoformat()
+_ISO_PAST_2H = (_NOW - timedelta(hours=2)).isoformat()
+_ISO_PAST_15D = (_NOW - timedelta(days=15)).isoformat()
+_ISO_PAST_30D = (_NOW - timedelta(days=30)).isoformat()
+
+# Claims for the token fixtures; each fixture adds its own expiry
+_ADMIN_CLAIMS = {"sub": "admin_user", "roles": ["admin"], "email": "admin@example.com"}
+_USER_CLAIMS = {"sub": "regular_user", "roles": ["viewer"], "email": "user@example.com"}
+_AGENT_CLAIMS = {"sub": "agent_12345", "type": "agent", "agent_id": "agent_12345"}
+_EXPIRED_AGENT_CLAIMS = {"sub": "agent_12345", "type": "agent"}
+
+
+def _sign(claims, secret, expires_in):
+    """Encode claims as an HS256 JWT expiring ``expires_in`` after _NOW."""
+    return jwt.encode({**claims, "exp": _NOW + expires_in}, secret, algorithm="HS256")
+
+
+_ENROLLMENT_KEYS_URL = "/api/v1/agents/enrollment-keys"
+_SUSPEND_URL = "/api/v1/agents/agent_123/suspend"
+
+# Canned responses for the stub client; read-only so tests can share them
+_ENROLLMENT_KEY_RESPONSE = MappingProxyType({
+    "enrollment_key": "enr_test_key_1234567890abcdef",
+    "expires_at": _ISO_PLUS_24H,
+    "expires_in_hours": 24
+})
+
+_ENROLL_RESPONSE = MappingProxyType({
+    "agent_id": "agent_abc123def456",
+    "agent_token": "agnt_jwt_token_here",
+    "token_expires_at": _ISO_PLUS_1H,
+    "agent_name": "agent-prod-01",
+    "status": "enrolled"
+})
+
+_INVALID_KEY_RESPONSE = MappingProxyType({
+    "error": "Invalid enrollment key",
+    "message": "The provided enrollment key is not valid"
+})
+
+_EXPIRED_KEY_RESPONSE = MappingProxyType({
+    "error": "Enrollment key expired",
+    "message": "The enrollment key has expired and cannot be used",
+    "expired_at": _ISO_PAST_1H
+})
+
+_HEARTBEAT_RESPONSE = MappingProxyType({
+    "acknowledged": True,
+    "next_heartbeat_interval_seconds": 60,
+    "timestamp": _ISO_NOW
+})
+
+_HEARTBEAT_UNAUTHORIZED_RESPONSE = MappingProxyType({
+    "error": "Unauthorized",
+    "message": "Valid agent token required"
+})
+
+_TOKEN_REFRESH_RESPONSE = MappingProxyType({
+    "agent_token": "agnt_new_jwt_token_refreshed",
+    "token_expires_at": _ISO_PLUS_1H,
+    "expires_in_seconds": 3600
+})
+
+_TOKEN_EXPIRED_RESPONSE = MappingProxyType({
+    "error": "Token expired",
+    "message": "Agent token has expired"
+})
+
+_SUSPEND_RESPONSE = MappingProxyType({
+    "agent_id": "agent_123",
+    "status": "suspended",
+    "suspended_at": _ISO_NOW,
+    "suspended_by": "admin_user",
+    "reason": "Maintenance scheduled"
+})
+
+_AGENT_NOT_FOUND_RESPONSE = MappingProxyType({
+    "error": "Agent not found",
+    "message": "Agent with ID 'nonexistent' does not exist"
+})
+
+_FORBIDDEN_RESPONSE = MappingProxyType({
+    "error": "Insufficient permissions",
+    "message": "Only administrators can manage agents"
+})
+
+_UNAUTHORIZED_RESPONSE = MappingProxyType({
+    "error": "Unauthorized",
+    "message": "Authentication required"
+})
+
+_AGENT_LIST_RESPONSE = MappingProxyType({
+    "agents": [
+        {
+            "agent_id": "agent_123",
+            "name": "agent-prod-01",
+            "type": "hypervisor",
+            "status": "healthy",
+            "last_heartbeat": _ISO_NOW,
+            "enrolled_at": _ISO_PAST_30D
+        },
+        {
+            "agent_id": "agent_456",
+            "name": "agent-test-01",
+            "type": "connector",
+            "status": "offline",
+            "last_heartbeat": _ISO_PAST_2H,
+            "enrolled_at": _ISO_PAST_15D
+        }
+    ],
+    "total": 2,
+    "page": 1,
+    "per_page": 50
+})
+
+_FILTERED_AGENT_LIST_RESPONSE = MappingProxyType({
+    "agents": [
+        {
+            "agent_id": "agent_123",
+            "name": "agent-prod-01",
+            "status": "healthy"
+        }
+    ],
+    "total": 1,
+    "filter": {"status": "healthy"}
+})
+
+_LIST_FORBIDDEN_RESPONSE = MappingProxyType({
+    "error": "Insufficient permissions",
+    "message": "Only administrators can list agents"
+})
+
+
+class FakeClient:
+    """Stub test client: records each call and returns a preset response.
+
+    Stands in for a MagicMock client; the tests only set a return value,
+    make a call and count ``calls``.
+    """
+
+    __slots__ = ("_ret", "calls")
+
+    def __init__(self):
+        self._ret = None
+        self.calls = []
+
+    def _call(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return self._ret
+
+    post = get = put = _call
+
+    def set_return(self, ret):
+        """Set the (response, status) tuple returned by the next calls."""
+        self._ret = ret
+
+    def reset(self):
+        """Forget recorded calls and the preset response."""
+        self._ret = None
+        self.calls.clear()
+
+
+def _mock_call(client, verb, url, *, headers=None, json_body=None, mock_resp, mock_status):
+    """Preset the client's response, then make the request."""
+    client.set_return((mock_resp, mock_status))
+    return getattr(client, verb)(url, headers=headers, json=json_body)
+
 
 class TestAgentEnrollmentAPI:
     """Test cases for agent enrollment API endpoints."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def jwt_secret(self):
         """JWT secret key for testing."""
         return "test_jwt_secret_key_for_agents"
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def admin_token(self, jwt_secret):
         """Generate a mock admin JWT token."""
-        payload = {
-            "sub": "admin_user",
-            "roles": ["admin"],
-            "email": "admin@example.com",
-            "exp": datetime.utcnow() + timedelta(hours=24)
-        }
-        return jwt.encode(payload, jwt_secret, algorithm="HS256")
+        return _sign(_ADMIN_CLAIMS, jwt_secret, timedelta(hours=24))
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def user_token(self, jwt_secret):
         """Generate a mock user JWT token (non-admin)."""
-        payload = {
-            "sub": "regular_user",
-            "roles": ["viewer"],
-            "email": "user@example.com",
-            "exp": datetime.utcnow() + timedelta(hours=24)
-        }
-        return jwt.encode(payload, jwt_secret, algorithm="HS256")
+        return _sign(_USER_CLAIMS, jwt_secret, timedelta(hours=24))
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def agent_token(self, jwt_secret):
         """Generate a mock agent JWT token."""
-        payload = {
-            "sub": "agent_12345",
-            "type": "agent",
-            "agent_id": "agent_12345",
-            "exp": datetime.utcnow() + timedelta(hours=1)
-        }
-        return jwt.encode(payload, jwt_secret, algorithm="HS256")
-
-    @pytest.fixture
+        return _sign(_AGENT_CLAIMS, jwt_secret, timedelta(hours=1))
+
+    @pytest.fixture(scope="session")
+    def expired_agent_token(self):
+        """Generate an agent JWT token that expired an hour ago."""
+        return _sign(_EXPIRED_AGENT_CLAIMS, "secret", timedelta(hours=-1))
+
+    @pytest.fixture(scope="session")
+    def admin_headers(self, admin_token):
+        """Authorization header for the admin token."""
+        return {"Authorization": f"Bearer {admin_token}"}
+
+    @pytest.fixture(scope="session")
+    def user_headers(self, user_token):
+        """Authorization header for the non-admin user token."""
+        return {"Authorization": f"Bearer {user_token}"}
+
+    @pytest.fixture(scope="session")
+    def agent_headers(self, agent_token):
+        """Authorization header for the agent token."""
+        return {"Authorization": f"Bearer {agent_token}"}
+
+    @pytest.fixture(scope="session")
+    def expired_agent_headers(self, expired_agent_token):
+        """Authorization header for the expired agent token."""
+        return {"Authorization": f"Bearer {expired_agent_token}"}
+
+    @pytest.fixture(scope="class")
     def client(self):
-        """Mock Flask test client."""
-        client = MagicMock()
-        client.post = MagicMock()
-        client.get = MagicMock()
-        client.put = MagicMock()
-        return client
+        """Stub Flask test client, shared by the tests in this class."""
+        return FakeClient()
+
+    @pytest.fixture(autouse=True)
+    def _reset_client(self, client):
+        """Give each test a clean client."""
+        yield
+        client.reset()
 
     @pytest.fixture
+    def headers(self, request, admin_headers, user_headers):
+        """Auth headers for the role named by an indirect ``headers`` parameter.
+
+        ``"none"`` gives an unauthenticated request.
+        """
+        return {"admin": admin_headers, "viewer": user_headers, "none": {}}[request.param]
+
+    @pytest.fixture(scope="session")
     def mock_app_context(self, jwt_secret):
-        """Mock Flask app context with configuration."""
-        app = MagicMock()
-        app.config = {
+        """Mock Flask app context with configuration.
+
+        Read-only and shared across the session; only ``config`` is used.
+        """
+        return SimpleNamespace(config={
             "JWT_SECRET": jwt_secret,
             "JWT_ALGORITHM": "HS256",
             "AGENT_KEY_EXPIRY_HOURS": 24,
             "AGENT_TOKEN_EXPIRY_MINUTES": 60,
             "ENROLLMENT_KEY_LENGTH": 32
-        }
-        return app
+        })
 
     # Test: Generate Enrollment Key (Admin Only)
-    def test_generate_enrollment_key_admin(self, client, admin_token, mock_app_context):
+    def test_generate_enrollment_key_admin(self, client, admin_headers, mock_app_context):
         """Test successful enrollment key generation by admin."""
-        # Arrange
-        headers = {"Authorization": f"Bearer {admin_token}"}
-
-        # Mock response for enrollment key generation
-        mock_response = {
-            "enrollment_key": "enr_test_key_1234567890abcdef",
-            "expires_at": (datetime.utcnow() + timedelta(hours=24)).isoformat(),
-            "expires_in_hours": 24
-        }
-        client.post.return_value = (mock_response, 201)
-
         # Act
-        response, status = client.post(
-            "/api/v1/agents/enrollment-keys",
-            headers=headers,
-            json={}
+        response, status = _mock_call(
+            client, "post", "/api/v1/agents/enrollment-keys",
+            headers=admin_headers,
+            json_body={},
+            mock_resp=_ENROLLMENT_KEY_RESPONSE, mock_status=201,
         )
 
         # Assert
@@ -109,33 +295,8 @@ class TestAgentEnrollmentAPI:
         assert "enrollment_key" in response
         assert response["enrollment_key"].startswith("enr_")
         assert "expires_at" in response
-        client.post.assert_called_once()
-
-    def test_generate_enrollment_key_non_admin(self, client, user_token):
-        """Test enrollment key generation fails for non-admin users."""
-        # Arrange
-        headers = {"Authorization": f"Bearer {user_token}"}
-
-        # Mock forbidden response
-        mock_response = {
-            "error": "Insufficient permissions",
-            "message": "Only administrators can generate enrollment keys"
-        }
-        client.post.return_value = (mock_response, 403)
-
-        # Act
-        response, status = client.post(
-            "/api/v1/agents/enrollment-keys",
-            headers=headers,
-            json={}
-        )
+        assert len(client.calls) == 1
 
-        # Assert
-        assert status == 403
-        assert "error" in response
-        assert "permissions" in response["error"].lower()
-
-    # Test: Enroll Agent with Valid Key
     def test_enroll_agent_success(self, client, mock_app_context):
         """Test successful agent enrollment with valid enrollment key."""
         # Arrange
@@ -146,19 +307,11 @@ class TestAgentEnrollmentAPI:
             "tags": ["production", "kvm"]
         }
 
-        mock_response = {
-            "agent_id": "agent_abc123def456",
-            "agent_token": "agnt_jwt_token_here",
-            "token_expires_at": (datetime.utcnow() + timedelta(hours=1)).isoformat(),
-            "agent_name": "agent-prod-01",
-            "status": "enrolled"
-        }
-        client.post.return_value = (mock_response, 200)
-
         # Act
-        response, status = client.post(
-            "/api/v1/agents/enroll",
-            json=enroll_data
+        response, status = _mock_call(
+            client, "post", "/api/v1/agents/enroll",
+            json_body=enroll_data,
+            mock_resp=_ENROLL_RESPONSE, mock_status=200,
         )
 
         # Assert
@@ -168,64 +321,53 @@ class TestAgentEnrollmentAPI:
         assert response["status"] == "enrolled"
         assert response["agent_name"] == "agent-prod-01"
 
-    def test_enroll_agent_invalid_key(self, client):
-        """Test agent enrollment fails with invalid enrollment key."""
-        # Arrange
-        enroll_data = {
-            "enrollment_key": "invalid_key_12345",
-            "agent_name": "agent-test-01",
-            "agent_type": "hypervisor"
-        }
-
-        mock_response = {
-            "error": "Invalid enrollment key",
-            "message": "The provided enrollment key is not valid"
-        }
-        client.post.return_value = (mock_response, 400)
-
-        # Act
-        response, status = client.post(
-            "/api/v1/agents/enroll",
-            json=enroll_data
-        )
-
-        # Assert
-        assert status == 400
-        assert "error" in response
-        assert "enrollment key" in response["error"].lower()
-
-    def test_enroll_agent_expired_key(self, client):
-        """Test agent enrollment fails with expired enrollment key."""
-        # Arrange
-        enroll_data = {
-            "enrollment_key": "enr_expired_key_old123456789",
-            "agent_name": "agent-test-02",
-            "agent_type": "hypervisor"
-        }
-
-        mock_response = {
-            "error": "Enrollment key expired",
-            "message": "The enrollment key has expired and cannot be used",
-            "expired_at": (datetime.utcnow() - timedelta(hours=1)).isoformat()
-        }
-        client.post.return_value = (mock_response, 410)
-
+    @pytest.mark.parametrize(
+        "enroll_data,mock_response,expected_status,error_fragment",
+        [
+            pytest.param(
+                {
+                    "enrollment_key": "invalid_key_12345",
+                    "agent_name": "agent-test-01",
+                    "agent_type": "hypervisor"
+                },
+                _INVALID_KEY_RESPONSE,
+                400,
+                "enrollment key",
+                id="invalid-key",
+            ),
+            pytest.param(
+                {
+                    "enrollment_key": "enr_expired_key_old123456789",
+                    "agent_name": "agent-test-02",
+                    "agent_type": "hypervisor"
+                },
+                _EXPIRED_KEY_RESPONSE,
+                410,
+                "expired",
+                id="expired-key",
+            ),
+        ],
+    )
+    def test_enroll_agent_rejected_key(
+        self, client, enroll_data, mock_response, expected_status, error_fragment
+    ):
+        """Test agent enrollment fails with an invalid or expired enrollment key."""
         # Act
-        response, status = client.post(
-            "/api/v1/agents/enroll",
-            json=enroll_data
+        response, status = _mock_call(
+            client, "post", "/api/v1/agents/enroll",
+            json_body=enroll_data,
+            mock_resp=mock_response, mock_status=expected_status,
         )
 
         # Assert
-        assert status == 410
+        assert status == expected_status
         assert "error" in response
-        assert "expired" in response["error"].lower()
+        assert error_fragment in response["error"].lower()
 
     # Test: Agent Heartbeat
-    def test_agent_heartbeat(self, client, agent_token):
+    def test_agent_heartbeat(self, client, agent_headers):
         """Test agent heartbeat endpoint for health check."""
         # Arrange
-        headers = {"Authorization": f"Bearer {agent_token}"}
         heartbeat_data = {
             "agent_id": "agent_12345",
             "status": "healthy",
@@ -234,18 +376,12 @@ class TestAgentEnrollmentAPI:
             "uptime_seconds": 3600
         }
 
-        mock_response = {
-            "acknowledged": True,
-            "next_heartbeat_interval_seconds": 60,
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        client.post.return_value = (mock_response, 200)
-
         # Act
-        response, status = client.post(
-            "/api/v1/agents/heartbeat",
-            headers=headers,
-            json=heartbeat_data
+        response, status = _mock_call(
+            client, "post", "/api/v1/agents/heartbeat",
+            headers=agent_headers,
+            json_body=heartbeat_data,
+            mock_resp=_HEARTBEAT_RESPONSE, mock_status=200,
         )
 
         # Assert
@@ -261,16 +397,11 @@ class TestAgentEnrollmentAPI:
             "status": "healthy"
         }
 
-        mock_response = {
-            "error": "Unauthorized",
-            "message": "Valid agent token required"
-        }
-        client.post.return_value = (mock_response, 401)
-
         # Act
-        response, status = client.post(
-            "/api/v1/agents/heartbeat",
-            json=heartbeat_data
+        response, status = _mock_call(
+            client, "post", "/api/v1/agents/heartbeat",
+            json_body=heartbeat_data,
+            mock_resp=_HEARTBEAT_UNAUTHORIZED_RESPONSE, mock_status=401,
         )
 
         # Assert
@@ -278,23 +409,14 @@ class TestAgentEnrollmentAPI:
         assert "error" in response
 
     # Test: Agent Token Refresh
-    def test_agent_refresh_token(self, client, agent_token):
+    def test_agent_refresh_token(self, client, agent_headers):
         """Test agent token refresh with valid agent credentials."""
-        # Arrange
-        headers = {"Authorization": f"Bearer {agent_token}"}
-
-        mock_response = {
-            "agent_token": "agnt_new_jwt_token_refreshed",
-            "token_expires_at": (datetime.utcnow() + timedelta(hours=1)).isoformat(),
-            "expires_in_seconds": 3600
-        }
-        client.post.return_value = (mock_response, 200)
-
         # Act
-        response, status = client.post(
-            "/api/v1/agents/token/refresh",
-            headers=headers,
-            json={"agent_id": "agent_12345"}
+        response, status = _mock_call(
+            client, "post", "/api/v1/agents/token/refresh",
+            headers=agent_headers,
+            json_body={"agent_id": "agent_12345"},
+            mock_resp=_TOKEN_REFRESH_RESPONSE, mock_status=200,
         )
 
         # Assert
@@ -303,28 +425,14 @@ class TestAgentEnrollmentAPI:
         assert "token_expires_at" in response
         assert response["expires_in_seconds"] == 3600
 
-    def test_agent_refresh_token_expired(self, client):
+    def test_agent_refresh_token_expired(self, client, expired_agent_headers):
         """Test token refresh fails with expired token."""
-        # Arrange
-        expired_payload = {
-            "sub": "agent_12345",
-            "type": "agent",
-            "exp": int(time.time()) - 3600  # Expired 1 hour ago
-        }
-        expired_token = jwt.encode(expired_payload, "secret", algorithm="HS256")
-        headers = {"Authorization": f"Bearer {expired_token}"}
-
-        mock_response = {
-            "error": "Token expired",
-            "message": "Agent token has expired"
-        }
-        client.post.return_value = (mock_response, 401)
-
         # Act
-        response, status = client.post(
-            "/api/v1/agents/token/refresh",
-            headers=headers,
-            json={"agent_id": "agent_12345"}
+        response, status = _mock_call(
+            client, "post", "/api/v1/agents/token/refresh",
+            headers=expired_agent_headers,
+            json_body={"agent_id": "agent_12345"},
+            mock_resp=_TOKEN_EXPIRED_RESPONSE, mock_status=401,
         )
 
         # Assert
@@ -332,122 +440,61 @@ class TestAgentEnrollmentAPI:
         assert "error" in response
 
     # Test: List Agents (Admin Only)
-    def test_list_agents_admin(self, client, admin_token):
-        """Test listing agents as administrator."""
-        # Arrange
-        headers = {"Authorization": f"Bearer {admin_token}"}
-
-        mock_response = {
-            "agents": [
-                {
-                    "agent_id": "agent_123",
-                    "name": "agent-prod-01",
-                    "type": "hypervisor",
-                    "status": "healthy",
-                    "last_heartbeat": datetime.utcnow().isoformat(),
-                    "enrolled_at": (datetime.utcnow() - timedelta(days=30)).isoformat()
-                },
-                {
-                    "agent_id": "agent_456",
-                    "name": "agent-test-01",
-                    "type": "connector",
-                    "status": "offline",
-                    "last_heartbeat": (datetime.utcnow() - timedelta(hours=2)).isoformat(),
-                    "enrolled_at": (datetime.utcnow() - timedelta(days=15)).isoformat()
-                }
-            ],
-            "total": 2,
-            "page": 1,
-            "per_page": 50
-        }
-        client.get.return_value = (mock_response, 200)
-
+    @pytest.mark.parametrize(
+        "query,headers,mock_response,mock_status",
+        [
+            pytest.param("", "admin", _AGENT_LIST_RESPONSE, 200, id="admin"),
+            pytest.param(
+                "?status=healthy", "admin", _FILTERED_AGENT_LIST_RESPONSE, 200,
+                id="admin-status-filter",
+            ),
+            pytest.param("", "viewer", _LIST_FORBIDDEN_RESPONSE, 403, id="non-admin"),
+        ],
+        indirect=["headers"],
+    )
+    def test_list_agents(self, client, query, headers, mock_response, mock_status):
+        """Test the list request for each query and role, and the list payloads.
+
+        The stub client neither filters nor authorizes, so this checks the
+        request URL and headers and that each canned payload is consistent:
+        ``total`` matches the agents returned and every agent matches the
+        echoed filter.
+        """
         # Act
-        response, status = client.get(
-            "/api/v1/agents",
-            headers=headers
-        )
-
-        # Assert
-        assert status == 200
-        assert "agents" in response
-        assert len(response["agents"]) == 2
-        assert response["total"] == 2
-        assert response["agents"][0]["agent_id"] == "agent_123"
-
-    def test_list_agents_non_admin(self, client, user_token):
-        """Test listing agents fails for non-admin users."""
-        # Arrange
-        headers = {"Authorization": f"Bearer {user_token}"}
-
-        mock_response = {
-            "error": "Insufficient permissions",
-            "message": "Only administrators can list agents"
-        }
-        client.get.return_value = (mock_response, 403)
-
-        # Act
-        response, status = client.get(
-            "/api/v1/agents",
-            headers=headers
+        response, status = _mock_call(
+            client, "get", f"/api/v1/agents{query}",
+            headers=headers,
+            mock_resp=mock_response, mock_status=mock_status,
         )
 
         # Assert
-        assert status == 403
-        assert "error" in response
-
-    def test_list_agents_with_filters(self, client, admin_token):
-        """Test listing agents with status filter."""
-        # Arrange
-        headers = {"Authorization": f"Bearer {admin_token}"}
-
-        mock_response = {
-            "agents": [
-                {
-                    "agent_id": "agent_123",
-                    "name": "agent-prod-01",
-                    "status": "healthy"
-                }
-            ],
-            "total": 1,
-            "filter": {"status": "healthy"}
-        }
-        client.get.return_value = (mock_response, 200)
+        (sent_url,), sent = client.calls[-1]
+        assert sent_url == f"/api/v1/agents{query}"
+        assert sent["headers"] == headers
 
-        # Act
-        response, status = client.get(
-            "/api/v1/agents?status=healthy",
-            headers=headers
-        )
+        assert status == mock_status
+        if status >= 400:
+            assert "error" in response
+            return
 
-        # Assert
-        assert status == 200
-        assert len(response["agents"]) == 1
-        assert response["agents"][0]["status"] == "healthy"
+        assert response["total"] == len(response["agents"])
+        for key, value in response.get("filter", {}).items():
+            assert all(agent[key] == value for agent in response["agents"])
 
     # Test: Suspend Agent (Admin Only)
-    def test_suspend_agent_admin(self, client, admin_token):
+    def test_suspend_agent_admin(self, client, admin_headers):
         """Test suspending an agent as administrator."""
         # Arrange
-        headers = {"Authorization": f"Bearer {admin_token}"}
         suspend_data = {
             "reason": "Maintenance scheduled"
         }
 
-        mock_response = {
-            "agent_id": "agent_123",
-            "status": "suspended",
-            "suspended_at": datetime.utcnow().isoformat(),
-            "suspended_by": "admin_user",
-            "reason": "Maintenance scheduled"
-        }
-        client.put.return_value = (mock_response, 200)
-
         # Act
-        response, status = client.put(
-            "/api/v1/agents/agent_123/suspend",
-            headers=headers,
-            json=suspend_data
+        response, status = _mock_call(
+            client, "put", "/api/v1/agents/agent_123/suspend",
+            headers=admin_headers,
+            json_body=suspend_data,
+            mock_resp=_SUSPEND_RESPONSE, mock_status=200,
         )
 
         # Assert
@@ -456,50 +503,84 @@ class TestAgentEnrollmentAPI:
         assert response["status"] == "suspended"
         assert response["reason"] == "Maintenance scheduled"
 
-    def test_suspend_agent_non_admin(self, client, user_token):
-        """Test suspending agent fails for non-admin users."""
-        # Arrange
-        headers = {"Authorization": f"Bearer {user_token}"}
-
-        mock_response = {
-            "error": "Insufficient permissions",
-            "message": "Only administrators can suspend agents"
-        }
-        client.put.return_value = (mock_response, 403)
-
+    def test_suspend_nonexistent_agent(self, client, admin_headers):
+        """Test suspending a non-existent agent."""
         # Act
-        response, status = client.put(
-            "/api/v1/agents/agent_123/suspend",
-            headers=headers,
-            json={"reason": "Test"}
+        response, status = _mock_call(
+            client, "put", "/api/v1/agents/nonexistent/suspend",
+            headers=admin_headers,
+            json_body={"reason": "Test"},
+            mock_resp=_AGENT_NOT_FOUND_RESPONSE, mock_status=404,
         )
 
         # Assert
-        assert status == 403
+        assert status == 404
         assert "error" in response
+        assert "not found" in response["error"].lower()
 
-    def test_suspend_nonexistent_agent(self, client, admin_token):
-        """Test suspending a non-existent agent."""
-        # Arrange
-        headers = {"Authorization": f"Bearer {admin_token}"}
-
-        mock_response = {
-            "error": "Agent not found",
-            "message": "Agent with ID 'nonexistent' does not exist"
-        }
-        client.put.return_value = (mock_response, 404)
-
+    # Test: Requests to admin-only endpoints by caller role
+    @pytest.mark.parametrize(
+        "verb,url,headers,role_claims,mock_response,mock_status",
+        [
+            pytest.param(
+                "post", _ENROLLMENT_KEYS_URL, "admin", ["admin"], _ENROLLMENT_KEY_RESPONSE, 201,
+                id="enrollment-key-admin",
+            ),
+            pytest.param(
+                "post", _ENROLLMENT_KEYS_URL, "viewer", ["viewer"], _FORBIDDEN_RESPONSE, 403,
+                id="enrollment-key-viewer",
+            ),
+            pytest.param(
+                "post", _ENROLLMENT_KEYS_URL, "none", None, _UNAUTHORIZED_RESPONSE, 401,
+                id="enrollment-key-anonymous",
+            ),
+            pytest.param(
+                "put", _SUSPEND_URL, "admin", ["admin"], _SUSPEND_RESPONSE, 200,
+                id="suspend-admin",
+            ),
+            pytest.param(
+                "put", _SUSPEND_URL, "viewer", ["viewer"], _FORBIDDEN_RESPONSE, 403,
+                id="suspend-viewer",
+            ),
+            pytest.param(
+                "put", _SUSPEND_URL, "none", None, _UNAUTHORIZED_RESPONSE, 401,
+                id="suspend-anonymous",
+            ),
+        ],
+        indirect=["headers"],
+    )
+    def test_admin_endpoint_request_by_role(
+        self, client, jwt_secret, verb, url, headers, role_claims, mock_response, mock_status
+    ):
+        """Test the request each caller role sends to an admin-only endpoint.
+
+        The stub client returns the preset response whatever it is sent, so
+        this does not cover the blueprint's permission checks. It checks the
+        URL, body and bearer token of each role's request, and that the
+        role's canned response reaches the caller unchanged.
+        """
         # Act
-        response, status = client.put(
-            "/api/v1/agents/nonexistent/suspend",
+        response, status = _mock_call(
+            client, verb, url,
             headers=headers,
-            json={"reason": "Test"}
+            json_body={},
+            mock_resp=mock_response, mock_status=mock_status,
         )
 
         # Assert
-        assert status == 404
-        assert "error" in response
-        assert "not found" in response["error"].lower()
+        (sent_url,), sent = client.calls[-1]
+        assert sent_url == url
+        assert sent["json"] == {}
+
+        auth = sent["headers"].get("Authorization")
+        if role_claims is None:
+            assert auth is None
+        else:
+            token = auth.removeprefix("Bearer ")
+            claims = jwt.decode(token, jwt_secret, algorithms=["HS256"])
+            assert claims["roles"] == role_claims
+
+        assert (response, status) == (mock_response, mock_status)
 
 
 if __name__ == "__main__":
@@ -6,158 +6,163 @@ Tests cover:
 - Session termination (owner, admin, permission denied)
 - Session type support (SSH, kubectl, docker, cloud_cli)
 - Permission validation and access control
+- Create and terminate latency benchmarks (pytest-benchmark)
 """
 
-import json
+import uuid
 from datetime import datetime
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import patch
 
 import pytest
 
-from gough.services.flask_backend.app.models import get_db
+from gough.services.flask_backend.app.api.shell import check_shell_access
+from gough.services.flask_backend.app.auth import create_access_token
+
+# Patched so session creation tests get a fixed permission outcome
+SHELL_ACCESS_CHECK = "gough.services.flask_backend.app.api.shell.check_shell_access"
+
+# Request bodies, built once and shared by every test that posts them
+_SSH_VM_BODY = {"resource_type": "vm", "resource_id": "shell-test-vm", "session_type": "ssh"}
+
+# Create request body for each supported session type
+SESSION_BODIES = [
+    pytest.param(_SSH_VM_BODY, id="ssh"),
+    pytest.param(
+        {"resource_type": "cluster", "resource_id": "test-cluster-01", "session_type": "kubectl"},
+        id="kubectl",
+    ),
+    pytest.param(
+        {"resource_type": "container", "resource_id": "test-container-01", "session_type": "docker"},
+        id="docker",
+    ),
+    pytest.param(
+        {"resource_type": "cloud", "resource_id": "aws-account-001", "session_type": "cloud_cli"},
+        id="cloud_cli",
+    ),
+    pytest.param(
+        {"resource_type": "cloud_account", "resource_id": "aws-prod", "session_type": "cloud_cli"},
+        id="cloud_cli-account",
+    ),
+]
+
+
+def _insert_session(request, user_id, ended_at=None):
+    """Insert a session row directly, skipping the create endpoint."""
+    db = request.getfixturevalue("db_session")
+    agent = request.getfixturevalue("mock_agent")
+    session_id = str(uuid.uuid4())
+    db.shell_sessions.insert(
+        session_id=session_id,
+        user_id=user_id,
+        resource_type="vm",
+        resource_id="shell-test-vm",
+        agent_id=agent.id,
+        session_type="ssh",
+        client_ip="127.0.0.1",
+        started_at=datetime.utcnow(),
+        ended_at=ended_at
+    )
+    return session_id
+
+
+# Preconditions for rejected terminate requests; each returns the session
+# id to delete and the headers to send, requesting only the fixtures it needs
+
+def _missing_session(request):
+    """No such session; requested by an admin."""
+    return "nonexistent-session-id", request.getfixturevalue("auth_headers")
+
+
+def _other_users_session(request):
+    """A session owned by another user; requested by a non-admin."""
+    owner = request.getfixturevalue("admin_user")
+    viewer = request.getfixturevalue("regular_user")
+    headers = {"Authorization": f"Bearer {create_access_token(viewer.id, 'viewer')}"}
+    return _insert_session(request, owner.id), headers
+
+
+def _terminated_session(request):
+    """A session that has already ended; requested by an admin."""
+    owner = request.getfixturevalue("regular_user")
+    session_id = _insert_session(request, owner.id, ended_at=datetime.utcnow())
+    return session_id, request.getfixturevalue("auth_headers")
+
+
+def _anonymous_request(request):
+    """No Authorization header."""
+    return "some-session-id", {}
+
+
+@pytest.fixture
+def shell_access_granted():
+    """Grant shell access to every resource."""
+    with patch(SHELL_ACCESS_CHECK, return_value=(True, None)) as check:
+        yield check
+
+
+@pytest.fixture
+def shell_access_denied():
+    """Deny shell access to every resource."""
+    denied = (False, "User does not have shell permission for this resource")
+    with patch(SHELL_ACCESS_CHECK, return_value=denied) as check:
+        yield check
 
 
 class TestCreateShellSession:
     """Test shell session creation endpoints."""
 
-    def test_create_shell_session_success(self, client, auth_headers, mock_agent, team_with_shell_access):
-        """Test successful shell session creation."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "resource_id": "shell-test-vm",
-                "session_type": "ssh"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
+    @pytest.mark.parametrize("body", SESSION_BODIES)
+    def test_create_session_authorized(self, client, auth_headers, mock_agent, shell_access_granted, body):
+        """Test shell session creation for each session type when access is granted."""
+        response = client.post("/api/v1/shell/sessions", json=body, headers=auth_headers)
 
         assert response.status_code == 201
         data = response.get_json()
         assert "session_id" in data
         assert "websocket_url" in data
-        assert data["session_type"] == "ssh"
+        assert data["session_type"] == body["session_type"]
         assert "agent_id" in data
         assert data["message"] == "Shell session created successfully"
 
-    def test_create_shell_session_kubectl(self, client, auth_headers, mock_agent, team_with_shell_access):
-        """Test creating a kubectl shell session."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "cluster",
-                "resource_id": "test-cluster-01",
-                "session_type": "kubectl"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
-
-        assert response.status_code in [201, 403, 404]
-        if response.status_code == 201:
-            data = response.get_json()
-            assert data["session_type"] == "kubectl"
-
-    def test_create_shell_session_docker(self, client, auth_headers, mock_agent, team_with_shell_access):
-        """Test creating a docker shell session."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "container",
-                "resource_id": "test-container-01",
-                "session_type": "docker"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
-
-        assert response.status_code in [201, 403, 404]
-        if response.status_code == 201:
-            data = response.get_json()
-            assert data["session_type"] == "docker"
-
-    def test_create_shell_session_cloud_cli(self, client, auth_headers, mock_agent, team_with_shell_access):
-        """Test creating a cloud_cli shell session."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "cloud",
-                "resource_id": "aws-account-001",
-                "session_type": "cloud_cli"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
-
-        assert response.status_code in [201, 403, 404]
-        if response.status_code == 201:
-            data = response.get_json()
-            assert data["session_type"] == "cloud_cli"
-
-    def test_create_shell_session_no_permission(self, client, auth_headers):
-        """Test shell session creation denied due to insufficient permissions."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "resource_id": "unauthorized-vm",
-                "session_type": "ssh"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
+    @pytest.mark.parametrize("body", SESSION_BODIES)
+    def test_create_session_forbidden(self, client, auth_headers, shell_access_denied, body):
+        """Test shell session creation for each session type when access is denied."""
+        response = client.post("/api/v1/shell/sessions", json=body, headers=auth_headers)
 
         assert response.status_code == 403
-        data = response.get_json()
-        assert "error" in data
+        assert b'"error"' in response.data
 
-    def test_create_shell_session_invalid_resource_type(self, client, auth_headers, mock_agent):
+    def test_create_shell_session_invalid_resource_type(self, client, auth_headers):
         """Test shell session creation with missing resource_type."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_id": "test-vm-001",
-                "session_type": "ssh"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
+        response = client.post("/api/v1/shell/sessions", json={
+            "resource_id": "test-vm-001",
+            "session_type": "ssh"
+        }, headers=auth_headers)
 
         assert response.status_code == 400
         data = response.get_json()
         assert "error" in data
         assert "resource_type" in data["error"].lower()
 
-    def test_create_shell_session_invalid_resource_id(self, client, auth_headers, mock_agent):
+    def test_create_shell_session_invalid_resource_id(self, client, auth_headers):
         """Test shell session creation with missing resource_id."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "session_type": "ssh"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
+        response = client.post("/api/v1/shell/sessions", json={
+            "resource_type": "vm",
+            "session_type": "ssh"
+        }, headers=auth_headers)
 
         assert response.status_code == 400
         data = response.get_json()
         assert "error" in data
         assert "resource_id" in data["error"].lower()
 
-    def test_create_shell_session_invalid_session_type(self, client, auth_headers, mock_agent, team_with_shell_access):
+    def test_create_shell_session_invalid_session_type(self, client, auth_headers):
         """Test shell session creation with invalid session_type."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "resource_id": "shell-test-vm",
-                "session_type": "invalid_type"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
+        response = client.post("/api/v1/shell/sessions", json={
+            "resource_type": "vm",
+            "resource_id": "shell-test-vm",
+            "session_type": "invalid_type"
+        }, headers=auth_headers)
 
         assert response.status_code == 400
         data = response.get_json()
@@ -166,42 +171,30 @@ class TestCreateShellSession:
 
     def test_create_shell_session_missing_body(self, client, auth_headers):
         """Test shell session creation with missing request body."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            headers=auth_headers,
-            content_type="application/json"
-        )
+        response = client.post("/api/v1/shell/sessions", json={}, headers=auth_headers)
 
         assert response.status_code == 400
-        data = response.get_json()
-        assert "error" in data
+        assert b'"error"' in response.data
 
-    def test_create_shell_session_no_agent_available(self, client, auth_headers, team_with_shell_access):
+    def test_create_shell_session_no_agent_available(
+        self, client, auth_headers, shell_access_granted, no_active_agents
+    ):
         """Test shell session creation when no agent is available."""
         response = client.post(
             "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "resource_id": "shell-test-vm",
-                "session_type": "ssh"
-            },
-            headers=auth_headers,
-            content_type="application/json"
+            json=_SSH_VM_BODY,
+            headers=auth_headers
         )
 
-        assert response.status_code in [201, 404]
+        assert response.status_code == 404
 
     def test_create_shell_session_unauthenticated(self, client):
         """Test shell session creation without authentication."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "resource_id": "test-vm-001",
-                "session_type": "ssh"
-            },
-            content_type="application/json"
-        )
+        response = client.post("/api/v1/shell/sessions", json={
+            "resource_type": "vm",
+            "resource_id": "test-vm-001",
+            "session_type": "ssh"
+        })
 
         assert response.status_code == 401
 
@@ -223,32 +216,27 @@ class TestListShellSessions:
         assert data["count"] == 0
         assert isinstance(data["sessions"], list)
 
-    def test_list_user_sessions_with_active(self, client, auth_headers, mock_agent, team_with_shell_access):
+    def test_list_user_sessions_with_active(self, client, auth_headers, mock_agent, shell_access_granted):
         """Test listing sessions includes active sessions."""
         # Create a session
         create_response = client.post(
             "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "resource_id": "shell-test-vm",
-                "session_type": "ssh"
-            },
-            headers=auth_headers,
-            content_type="application/json"
+            json=_SSH_VM_BODY,
+            headers=auth_headers
         )
+        assert create_response.status_code == 201
 
-        if create_response.status_code == 201:
-            # List sessions
-            list_response = client.get(
-                "/api/v1/shell/sessions",
-                headers=auth_headers
-            )
+        # List sessions
+        list_response = client.get(
+            "/api/v1/shell/sessions",
+            headers=auth_headers
+        )
 
-            assert list_response.status_code == 200
-            data = list_response.get_json()
-            assert "sessions" in data
-            assert data["count"] >= 1
-            assert any(s["session_type"] == "ssh" for s in data["sessions"])
+        assert list_response.status_code == 200
+        data = list_response.get_json()
+        assert "sessions" in data
+        assert data["count"] >= 1
+        assert any(s["session_type"] == "ssh" for s in data["sessions"])
 
     def test_list_user_sessions_field_validation(self, client, auth_headers):
         """Test that session list contains required fields."""
@@ -258,11 +246,10 @@ class TestListShellSessions:
         )
 
         assert response.status_code == 200
-        data = response.get_json()
 
-        # Verify response structure
-        assert "sessions" in data
-        assert "count" in data
+        # Verify response structure; keys only, so skip decoding
+        assert b'"sessions"' in response.data
+        assert b'"count"' in response.data
 
     def test_list_sessions_unauthenticated(self, client):
         """Test listing sessions without authentication."""
@@ -274,188 +261,57 @@ class TestListShellSessions:
 class TestTerminateShellSession:
     """Test shell session termination endpoints."""
 
-    def test_terminate_session_by_owner(self, client, auth_headers, mock_agent, team_with_shell_access):
+    def test_terminate_session_by_owner(self, client, auth_headers, mock_agent, shell_access_granted):
         """Test session termination by session owner."""
         # Create a session
         create_response = client.post(
             "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "resource_id": "shell-test-vm",
-                "session_type": "ssh"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
-
-        if create_response.status_code == 201:
-            session_id = create_response.get_json()["session_id"]
-
-            # Terminate the session
-            terminate_response = client.delete(
-                f"/api/v1/shell/sessions/{session_id}",
-                headers=auth_headers
-            )
-
-            assert terminate_response.status_code == 200
-            data = terminate_response.get_json()
-            assert data["session_id"] == session_id
-            assert "duration_seconds" in data
-
-    def test_terminate_session_not_found(self, client, auth_headers):
-        """Test termination of non-existent session."""
-        response = client.delete(
-            "/api/v1/shell/sessions/nonexistent-session-id",
+            json=_SSH_VM_BODY,
             headers=auth_headers
         )
+        assert create_response.status_code == 201
+        session_id = create_response.get_json()["session_id"]
 
-        assert response.status_code == 404
-        data = response.get_json()
-        assert "error" in data
-
-    def test_terminate_session_not_owner(self, client, auth_headers, admin_user, mock_agent, team_with_shell_access):
-        """Test that non-owner cannot terminate another user's session."""
-        # Create a session with admin user (needs separate auth headers)
-        response = client.delete(
-            "/api/v1/shell/sessions/session-owned-by-other-user",
+        # Terminate the session
+        terminate_response = client.delete(
+            f"/api/v1/shell/sessions/{session_id}",
             headers=auth_headers
         )
 
-        assert response.status_code in [403, 404]
-
-    def test_terminate_already_terminated_session(self, client, auth_headers, mock_agent, team_with_shell_access):
-        """Test terminating an already terminated session."""
-        # Create and terminate a session
-        create_response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "resource_id": "shell-test-vm",
-                "session_type": "ssh"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
-
-        if create_response.status_code == 201:
-            session_id = create_response.get_json()["session_id"]
-
-            # First termination
-            first_terminate = client.delete(
-                f"/api/v1/shell/sessions/{session_id}",
-                headers=auth_headers
-            )
-            assert first_terminate.status_code == 200
+        assert terminate_response.status_code == 200
+        data = terminate_response.get_json()
+        assert data["session_id"] == session_id
+        assert "duration_seconds" in data
 
-            # Second termination attempt
-            second_terminate = client.delete(
-                f"/api/v1/shell/sessions/{session_id}",
-                headers=auth_headers
-            )
-            assert second_terminate.status_code in [400, 404]
+    @pytest.mark.parametrize(
+        "setup,expected_status",
+        [
+            pytest.param(_missing_session, 404, id="not-found"),
+            pytest.param(_other_users_session, 403, id="not-owner"),
+            pytest.param(_terminated_session, 400, id="already-terminated"),
+            pytest.param(_anonymous_request, 401, id="unauthenticated"),
+        ],
+    )
+    def test_terminate_session_rejected(self, request, client, setup, expected_status):
+        """Test that terminate requests are rejected for each failing precondition."""
+        session_id, headers = setup(request)
 
-    def test_terminate_session_unauthenticated(self, client):
-        """Test session termination without authentication."""
-        response = client.delete("/api/v1/shell/sessions/some-session-id")
+        response = client.delete(f"/api/v1/shell/sessions/{session_id}", headers=headers)
 
-        assert response.status_code == 401
+        assert response.status_code == expected_status
+        assert b'"error"' in response.data
 
 
 class TestSessionTypes:
     """Test different shell session types."""
 
-    @pytest.mark.parametrize("session_type", ["ssh", "kubectl", "docker", "cloud_cli"])
-    def test_session_type_support(self, client, auth_headers, mock_agent, team_with_shell_access, session_type):
-        """Test that all session types are supported."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "resource_id": "shell-test-vm",
-                "session_type": session_type
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
-
-        assert response.status_code in [201, 403, 404]
-        if response.status_code == 201:
-            data = response.get_json()
-            assert data["session_type"] == session_type
-
-    def test_ssh_session_type(self, client, auth_headers, mock_agent, team_with_shell_access):
-        """Test SSH session type specifically."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "resource_id": "shell-test-vm",
-                "session_type": "ssh"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
-
-        if response.status_code == 201:
-            assert response.get_json()["session_type"] == "ssh"
-
-    def test_kubectl_session_type(self, client, auth_headers, mock_agent):
-        """Test kubectl session type specifically."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "cluster",
-                "resource_id": "test-cluster",
-                "session_type": "kubectl"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
-
-        assert response.status_code in [201, 403, 404]
-
-    def test_docker_session_type(self, client, auth_headers, mock_agent):
-        """Test docker session type specifically."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "container",
-                "resource_id": "test-container",
-                "session_type": "docker"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
-
-        assert response.status_code in [201, 403, 404]
-
-    def test_cloud_cli_session_type(self, client, auth_headers, mock_agent):
-        """Test cloud_cli session type specifically."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "cloud_account",
-                "resource_id": "aws-prod",
-                "session_type": "cloud_cli"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
-
-        assert response.status_code in [201, 403, 404]
-
-    def test_invalid_session_type_rejected(self, client, auth_headers, mock_agent):
+    def test_invalid_session_type_rejected(self, client, auth_headers):
         """Test that invalid session types are rejected."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "resource_id": "test-vm",
-                "session_type": "invalid"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
+        response = client.post("/api/v1/shell/sessions", json={
+            "resource_type": "vm",
+            "resource_id": "test-vm",
+            "session_type": "invalid"
+        }, headers=auth_headers)
 
         assert response.status_code == 400
 
@@ -465,7 +321,6 @@ class TestShellPermissions:
 
     def test_admin_has_all_access(self, client, auth_headers, mock_agent):
         """Test that admin users have access to all resources."""
-        # Admin should have access by default
         response = client.post(
             "/api/v1/shell/sessions",
             json={
@@ -473,82 +328,94 @@ class TestShellPermissions:
                 "resource_id": "any-resource",
                 "session_type": "ssh"
             },
-            headers=auth_headers,
-            content_type="application/json"
+            headers=auth_headers
         )
 
-        # Admin in auth_headers, should have access
-        assert response.status_code in [201, 404]
+        # auth_headers belong to an admin, who needs no team assignment
+        assert response.status_code == 201
 
-    def test_team_member_shell_access(self, client, auth_headers, mock_agent, team_with_shell_access):
+    def test_team_member_shell_access(self, db_session, regular_user, team_with_shell_access):
         """Test that team members with shell permission can access resources."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "resource_id": "shell-test-vm",
-                "session_type": "ssh"
-            },
-            headers=auth_headers,
-            content_type="application/json"
+        db_session.team_members.insert(
+            team_id=team_with_shell_access["team_id"],
+            user_id=regular_user.id,
+            role="member",
+            added_by=regular_user.id
         )
+        db_session.commit()
 
-        assert response.status_code in [201, 404]
+        assert check_shell_access(regular_user.id, "vm", "shell-test-vm") == (True, None)
 
-    def test_user_without_team_access_denied(self, client, auth_headers):
+    def test_user_without_team_access_denied(self, regular_user):
         """Test that users not in required team are denied."""
-        response = client.post(
-            "/api/v1/shell/sessions",
-            json={
-                "resource_type": "restricted_resource",
-                "resource_id": "secret-vm",
-                "session_type": "ssh"
-            },
-            headers=auth_headers,
-            content_type="application/json"
-        )
+        has_access, error_msg = check_shell_access(regular_user.id, "vm", "secret-vm")
 
-        assert response.status_code in [403, 404]
+        assert has_access is False
+        assert error_msg == "User not member of any team with access to this resource"
 
 
 class TestWebSocketURL:
     """Test WebSocket URL generation for sessions."""
 
-    def test_websocket_url_format(self, client, auth_headers, mock_agent, team_with_shell_access):
+    def test_websocket_url_format(self, client, auth_headers, mock_agent, shell_access_granted):
         """Test that WebSocket URL is properly formatted."""
         response = client.post(
             "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "resource_id": "shell-test-vm",
-                "session_type": "ssh"
-            },
-            headers=auth_headers,
-            content_type="application/json"
+            json=_SSH_VM_BODY,
+            headers=auth_headers
         )
 
-        if response.status_code == 201:
-            data = response.get_json()
-            websocket_url = data["websocket_url"]
+        assert response.status_code == 201
+        data = response.get_json()
+        websocket_url = data["websocket_url"]
 
-            # Verify WebSocket URL format
-            assert websocket_url.startswith("wss://")
-            assert "/ws/shell/" in websocket_url
-            assert data["session_id"] in websocket_url
+        # Verify WebSocket URL format
+        assert websocket_url.startswith("wss://")
+        assert "/ws/shell/" in websocket_url
+        assert data["session_id"] in websocket_url
 
-    def test_websocket_url_includes_session_id(self, client, auth_headers, mock_agent, team_with_shell_access):
+    def test_websocket_url_includes_session_id(self, client, auth_headers, mock_agent, shell_access_granted):
         """Test that WebSocket URL includes the session ID."""
         response = client.post(
             "/api/v1/shell/sessions",
-            json={
-                "resource_type": "vm",
-                "resource_id": "shell-test-vm",
-                "session_type": "ssh"
-            },
-            headers=auth_headers,
-            content_type="application/json"
+            json=_SSH_VM_BODY,
+            headers=auth_headers
+        )
+
+        assert response.status_code == 201
+        data = response.get_json()
+        assert data["session_id"] in data["websocket_url"]
+
+
+@pytest.mark.performance
+class TestShellSessionBenchmarks:
+    """Latency benchmarks for shell session create and terminate.
+
+    CI compares these against a saved baseline with
+    ``pytest --benchmark-only --benchmark-compare --benchmark-compare-fail=mean:10%``.
+    """
+
+    @pytest.mark.benchmark(group="shell-create")
+    def test_bench_create(self, benchmark, client, auth_headers, mock_agent, shell_access_granted):
+        """Benchmark steady-state session creation."""
+        response = benchmark.pedantic(
+            client.post,
+            args=("/api/v1/shell/sessions",),
+            kwargs={"json": _SSH_VM_BODY, "headers": auth_headers},
+            rounds=50,
+            warmup_rounds=5,
+            iterations=1
         )
 
-        if response.status_code == 201:
-            data = response.get_json()
-            assert data["session_id"] in data["websocket_url"]
+        assert response.status_code == 201
+
+    @pytest.mark.benchmark(group="shell-terminate")
+    def test_bench_terminate(self, request, benchmark, client, auth_headers, regular_user):
+        """Benchmark terminating a session, with a fresh session each round."""
+        def new_session():
+            session_id = _insert_session(request, regular_user.id)
+            return (f"/api/v1/shell/sessions/{session_id}",), {"headers": auth_headers}
+
+        response = benchmark.pedantic(client.delete, setup=new_session, rounds=50, warmup_rounds=5)
+
+        assert response.status_code == 200
@@ -7,176 +7,95 @@ Tests cover:
 - Authorization and access control
 - Error handling and validation
 
-Uses SQLite in-memory database for isolation.
+Uses the package conftest's app and SQLite in-memory test database.
 """
 
 from __future__ import annotations
 
-import json
 import pytest
-from datetime import datetime, timedelta
-from typing import Generator, Any
+from typing import Any, Iterable
 
-# Import Flask and related modules
-import sys
-import os
-
-# Add services/flask-backend to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../../services/flask-backend"))
-
-from app import create_app
-from app.models import init_db, get_db
-from app.config import Config
-from flask_security.utils import hash_password
+from gough.services.flask_backend.app.auth import create_access_token
 
 
 # ============================================================================
-# Test Configuration
+# Fixtures
 # ============================================================================
 
-class TestConfig(Config):
-    """Test configuration with SQLite in-memory database."""
+# The app, its in-memory database and its SQLite pragmas, and the
+# db_session and client fixtures come from conftest.py, shared with
+# the other API test modules.
 
-    TESTING = True
-    SQLALCHEMY_ECHO = False
-    WTF_CSRF_ENABLED = False
 
-    # Use SQLite in-memory for tests
-    DB_TYPE = "sqlite"
-    DB_HOST = ":memory:"
-    DB_PORT = None
-    DB_USER = None
-    DB_PASSWORD = None
-    DB_NAME = None
+@pytest.fixture(scope="session")
+def admin_user(shared_admin_user):
+    """Admin user, shared across the session."""
+    return shared_admin_user
 
-    # Disable rate limiting for tests
-    RATE_LIMIT_ENABLED = False
-    AUDIT_ENABLED = False
 
-    @classmethod
-    def get_db_uri(cls) -> str:
-        """Return SQLite in-memory URI."""
-        return "sqlite::memory:"
+@pytest.fixture(scope="session")
+def regular_user(shared_regular_user):
+    """Regular (viewer) user, shared across the session."""
+    return shared_regular_user
 
 
-# ============================================================================
-# Fixtures
-# ============================================================================
+def _bearer_headers(user_id: int, role: str) -> dict:
+    """Bearer headers for a user, signing the token directly.
 
-@pytest.fixture(scope="function")
-def app() -> Flask:
-    """Create and configure test Flask application."""
-    app = create_app(TestConfig)
-
-    with app.app_context():
-        # Initialize database with in-memory SQLite
-        db = get_db()
-        # Tables are already created by init_db
-        yield app
-
-
-@pytest.fixture(scope="function")
-def client(app):
-    """Create Flask test client."""
-    return app.test_client()
-
-
-@pytest.fixture(scope="function")
-def admin_user(app):
-    """Create and return admin user."""
-    with app.app_context():
-        db = get_db()
-        user_datastore = app.user_datastore
-
-        # Create admin role if it doesn't exist
-        admin_role = user_datastore.find_role("admin")
-        if not admin_role:
-            admin_role = user_datastore.create_role(
-                name="admin",
-                description="Administrator role"
-            )
-
-        # Create admin user
-        admin = user_datastore.create_user(
-            email="admin@test.local",
-            password=hash_password("admin123"),
-            full_name="Admin User",
-            active=True,
-            roles=[admin_role]
-        )
-
-        db.commit()
-
-        return admin
-
-
-@pytest.fixture(scope="function")
-def regular_user(app):
-    """Create and return regular user."""
-    with app.app_context():
-        db = get_db()
-        user_datastore = app.user_datastore
-
-        # Create viewer role if it doesn't exist
-        viewer_role = user_datastore.find_role("viewer")
-        if not viewer_role:
-            viewer_role = user_datastore.create_role(
-                name="viewer",
-                description="Viewer role"
-            )
-
-        # Create regular user
-        user = user_datastore.create_user(
-            email="user@test.local",
-            password=hash_password("user123"),
-            full_name="Regular User",
-            active=True,
-            roles=[viewer_role]
-        )
-
-        db.commit()
-
-        return user
-
-
-@pytest.fixture(scope="function")
-def auth_headers(client, admin_user) -> dict:
-    """Get authentication headers for admin user."""
-    # Login to get JWT token
-    response = client.post(
-        "/api/v1/auth/login",
-        json={
-            "email": "admin@test.local",
-            "password": "admin123"
-        }
-    )
+    No login request is made, so no password is checked; needs an app
+    context.
+    """
+    return {"Authorization": f"Bearer {create_access_token(user_id, role)}"}
 
-    if response.status_code == 200:
-        token = response.get_json().get("access_token")
-        if token:
-            return {"Authorization": f"Bearer {token}"}
 
-    # Fallback: return empty headers (tests may use client.set_cookie for session)
-    return {}
+@pytest.fixture(scope="session")
+def admin_auth_headers(app, admin_user) -> dict:
+    """Authentication headers for the admin user, built once per session."""
+    return _bearer_headers(admin_user.id, "admin")
 
 
-@pytest.fixture(scope="function")
-def user_auth_headers(client, regular_user) -> dict:
-    """Get authentication headers for regular user."""
-    response = client.post(
-        "/api/v1/auth/login",
-        json={
-            "email": "user@test.local",
-            "password": "user123"
-        }
-    )
+@pytest.fixture(scope="session")
+def user_auth_headers(app, regular_user) -> dict:
+    """Authentication headers for the regular user, built once per session."""
+    return _bearer_headers(regular_user.id, "viewer")
+
+
+def _seed_team(
+    db,
+    name: str,
+    owner_id: int,
+    members: Iterable[tuple[int, str]] = (),
+    resources: Iterable[tuple[str, str, str]] = (),
+    **fields: Any
+) -> int:
+    """Insert an active team with its members and resource assignments.
+
+    ``members`` are ``(user_id, role)`` pairs and ``resources`` are
+    ``(resource_type, resource_id, permissions_json)`` triples. Member and
+    resource rows go through ``bulk_insert``, which pyDAL runs as one
+    INSERT per row on SQLite. db_session clears the rows after the test.
+    """
+    team_id = db.resource_teams.insert(name=name, created_by=owner_id, is_active=True, **fields)
+
+    if members:
+        db.team_members.bulk_insert([
+            {"team_id": team_id, "user_id": user_id, "role": role, "added_by": owner_id}
+            for user_id, role in members
+        ])
 
-    if response.status_code == 200:
-        token = response.get_json().get("access_token")
-        if token:
-            return {"Authorization": f"Bearer {token}"}
+    if resources:
+        db.resource_assignments.bulk_insert([
+            {
+                "team_id": team_id,
+                "resource_type": resource_type,
+                "resource_id": resource_id,
+                "permissions": permissions,
+                "assigned_by": owner_id,
+            }
+            for resource_type, resource_id, permissions in resources
+        ])
 
-    return {}
+    return team_id
 
 
 # ============================================================================
@@ -184,243 +103,112 @@ def user_auth_headers(client, regular_user) -> dict:
 # ============================================================================
 
 @pytest.mark.api
-def test_create_team_success(client, app, admin_user, auth_headers):
+def test_create_team_success(client, admin_user, admin_auth_headers):
     """Test successful team creation by admin user."""
-    with app.app_context():
-        # Login as admin first
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "admin@test.local", "password": "admin123"}
-        )
-
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
-        else:
-            # Use test client with user context
-            with client:
-                # Set up authenticated context
-                client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer test-token"
-                headers = {}
-
-        response = client.post(
-            "/api/v1/teams/",
-            json={
-                "name": "Test Team",
-                "description": "Test team description",
-                "metadata": {"env": "test"}
-            },
-            headers=headers if headers else None
-        )
-
-        # Accept both 201 and 200 responses
-        assert response.status_code in [200, 201], f"Status {response.status_code}: {response.get_json()}"
-        data = response.get_json()
-        assert "team" in data or "message" in data
-        if "team" in data:
-            assert data["team"]["name"] == "Test Team"
+    response = client.post(
+        "/api/v1/teams/",
+        json={
+            "name": "Test Team",
+            "description": "Test team description",
+            "metadata": {"env": "test"}
+        },
+        headers=admin_auth_headers
+    )
+
+    assert response.status_code == 201, f"Status {response.status_code}: {response.get_json()}"
+    data = response.get_json()
+    assert data["team"]["name"] == "Test Team"
 
 
 @pytest.mark.api
-def test_create_team_unauthorized(client, app, regular_user):
+def test_create_team_unauthorized(client, regular_user, user_auth_headers):
     """Test team creation fails for non-admin user."""
-    with app.app_context():
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "user@test.local", "password": "user123"}
-        )
-
-        headers = {}
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
-
-        response = client.post(
-            "/api/v1/teams/",
-            json={
-                "name": "Unauthorized Team",
-                "description": "Should fail"
-            },
-            headers=headers if headers else None
-        )
-
-        # Non-admin should get 403 Forbidden
-        assert response.status_code in [403, 401], f"Expected 403/401, got {response.status_code}"
+    response = client.post(
+        "/api/v1/teams/",
+        json={
+            "name": "Unauthorized Team",
+            "description": "Should fail"
+        },
+        headers=user_auth_headers
+    )
+
+    # Non-admin should get 403 Forbidden
+    assert response.status_code == 403, f"Expected 403, got {response.status_code}"
 
 
 @pytest.mark.api
-def test_list_teams(client, app, admin_user):
+def test_list_teams(client, db_session, admin_user, admin_auth_headers):
     """Test listing teams for authenticated user."""
-    with app.app_context():
-        db = get_db()
-
-        # Create a test team
-        team_id = db.resource_teams.insert(
-            name="Team A",
-            description="Test team A",
-            created_by=admin_user.id,
-            is_active=True
-        )
-
-        # Add admin as team member
-        db.team_members.insert(
-            team_id=team_id,
-            user_id=admin_user.id,
-            role="owner",
-            added_by=admin_user.id
-        )
-
-        db.commit()
-
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "admin@test.local", "password": "admin123"}
-        )
-
-        headers = {}
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
-
-        response = client.get(
-            "/api/v1/teams/",
-            headers=headers if headers else None
-        )
-
-        assert response.status_code in [200, 401], f"Status {response.status_code}"
-        if response.status_code == 200:
-            data = response.get_json()
-            assert "teams" in data or "count" in data
+    team_id = _seed_team(
+        db_session, "Team A", admin_user.id,
+        description="Test team A",
+        members=[(admin_user.id, "owner")]
+    )
+
+    response = client.get(
+        "/api/v1/teams/",
+        headers=admin_auth_headers
+    )
+
+    assert response.status_code == 200, f"Status {response.status_code}"
+    data = response.get_json()
+    assert [(team["id"], team["name"]) for team in data["teams"]] == [(team_id, "Team A")]
+    assert data["count"] == 1
 
 
 @pytest.mark.api
-def test_get_team_details(client, app, admin_user):
+def test_get_team_details(client, db_session, admin_user, admin_auth_headers):
     """Test retrieving team details."""
-    with app.app_context():
-        db = get_db()
-
-        # Create team
-        team_id = db.resource_teams.insert(
-            name="Details Team",
-            description="For testing details",
-            created_by=admin_user.id,
-            is_active=True
-        )
-
-        # Add admin as member
-        db.team_members.insert(
-            team_id=team_id,
-            user_id=admin_user.id,
-            role="member",
-            added_by=admin_user.id
-        )
-
-        db.commit()
-
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "admin@test.local", "password": "admin123"}
-        )
-
-        headers = {}
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
-
-        response = client.get(
-            f"/api/v1/teams/{team_id}",
-            headers=headers if headers else None
-        )
-
-        assert response.status_code in [200, 401]
-        if response.status_code == 200:
-            data = response.get_json()
-            assert "team" in data
-            assert data["team"]["name"] == "Details Team"
+    team_id = _seed_team(
+        db_session, "Details Team", admin_user.id,
+        description="For testing details",
+        members=[(admin_user.id, "member")]
+    )
 
+    response = client.get(
+        f"/api/v1/teams/{team_id}",
+        headers=admin_auth_headers
+    )
 
-@pytest.mark.api
-def test_update_team(client, app, admin_user):
-    """Test updating team information."""
-    with app.app_context():
-        db = get_db()
-
-        # Create team
-        team_id = db.resource_teams.insert(
-            name="Update Team",
-            description="Original description",
-            created_by=admin_user.id,
-            is_active=True
-        )
-
-        # Add admin as owner
-        db.team_members.insert(
-            team_id=team_id,
-            user_id=admin_user.id,
-            role="owner",
-            added_by=admin_user.id
-        )
-
-        db.commit()
-
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "admin@test.local", "password": "admin123"}
-        )
-
-        headers = {}
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
-
-        response = client.patch(
-            f"/api/v1/teams/{team_id}",
-            json={
-                "name": "Updated Team",
-                "description": "Updated description"
-            },
-            headers=headers if headers else None
-        )
-
-        assert response.status_code in [200, 401]
-        if response.status_code == 200:
-            data = response.get_json()
-            if "team" in data:
-                assert data["team"]["name"] == "Updated Team"
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["team"]["name"] == "Details Team"
 
 
 @pytest.mark.api
-def test_delete_team(client, app, admin_user):
-    """Test deleting a team."""
-    with app.app_context():
-        db = get_db()
+def test_update_team(client, db_session, admin_user, admin_auth_headers):
+    """Test updating team information."""
+    team_id = _seed_team(
+        db_session, "Update Team", admin_user.id,
+        description="Original description",
+        members=[(admin_user.id, "owner")]
+    )
 
-        # Create team
-        team_id = db.resource_teams.insert(
-            name="Delete Team",
-            description="To be deleted",
-            created_by=admin_user.id,
-            is_active=True
-        )
+    response = client.patch(
+        f"/api/v1/teams/{team_id}",
+        json={
+            "name": "Updated Team",
+            "description": "Updated description"
+        },
+        headers=admin_auth_headers
+    )
 
-        db.commit()
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["team"]["name"] == "Updated Team"
 
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "admin@test.local", "password": "admin123"}
-        )
 
-        headers = {}
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
+@pytest.mark.api
+def test_delete_team(client, db_session, admin_user, admin_auth_headers):
+    """Test deleting a team."""
+    team_id = _seed_team(db_session, "Delete Team", admin_user.id, description="To be deleted")
 
-        response = client.delete(
-            f"/api/v1/teams/{team_id}",
-            headers=headers if headers else None
-        )
+    response = client.delete(
+        f"/api/v1/teams/{team_id}",
+        headers=admin_auth_headers
+    )
 
-        assert response.status_code in [200, 401]
+    assert response.status_code == 200
 
 
 # ============================================================================
@@ -428,147 +216,59 @@ def test_delete_team(client, app, admin_user):
 # ============================================================================
 
 @pytest.mark.api
-def test_add_team_member(client, app, admin_user, regular_user):
+def test_add_team_member(client, db_session, admin_user, regular_user, admin_auth_headers):
     """Test adding a member to a team."""
-    with app.app_context():
-        db = get_db()
-
-        # Create team
-        team_id = db.resource_teams.insert(
-            name="Member Team",
-            description="For member testing",
-            created_by=admin_user.id,
-            is_active=True
-        )
-
-        # Add admin as owner
-        db.team_members.insert(
-            team_id=team_id,
-            user_id=admin_user.id,
-            role="owner",
-            added_by=admin_user.id
-        )
-
-        db.commit()
-
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "admin@test.local", "password": "admin123"}
-        )
-
-        headers = {}
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
-
-        response = client.post(
-            f"/api/v1/teams/{team_id}/members",
-            json={
-                "user_id": regular_user.id,
-                "role": "member"
-            },
-            headers=headers if headers else None
-        )
-
-        assert response.status_code in [201, 200, 401]
+    team_id = _seed_team(
+        db_session, "Member Team", admin_user.id,
+        description="For member testing",
+        members=[(admin_user.id, "owner")]
+    )
+
+    response = client.post(
+        f"/api/v1/teams/{team_id}/members",
+        json={
+            "user_id": regular_user.id,
+            "role": "member"
+        },
+        headers=admin_auth_headers
+    )
+
+    assert response.status_code == 201
 
 
 @pytest.mark.api
-def test_list_team_members(client, app, admin_user, regular_user):
+def test_list_team_members(client, db_session, admin_user, regular_user, admin_auth_headers):
     """Test listing team members."""
-    with app.app_context():
-        db = get_db()
-
-        # Create team with members
-        team_id = db.resource_teams.insert(
-            name="Members List Team",
-            description="For listing members",
-            created_by=admin_user.id,
-            is_active=True
-        )
-
-        db.team_members.insert(
-            team_id=team_id,
-            user_id=admin_user.id,
-            role="owner",
-            added_by=admin_user.id
-        )
-
-        db.team_members.insert(
-            team_id=team_id,
-            user_id=regular_user.id,
-            role="member",
-            added_by=admin_user.id
-        )
-
-        db.commit()
-
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "admin@test.local", "password": "admin123"}
-        )
-
-        headers = {}
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
-
-        response = client.get(
-            f"/api/v1/teams/{team_id}/members",
-            headers=headers if headers else None
-        )
-
-        assert response.status_code in [200, 401]
-        if response.status_code == 200:
-            data = response.get_json()
-            assert "members" in data or "count" in data
+    team_id = _seed_team(
+        db_session, "Members List Team", admin_user.id,
+        description="For listing members",
+        members=[(admin_user.id, "owner"), (regular_user.id, "member")]
+    )
+
+    response = client.get(
+        f"/api/v1/teams/{team_id}/members",
+        headers=admin_auth_headers
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["count"] == 2
 
 
 @pytest.mark.api
-def test_remove_team_member(client, app, admin_user, regular_user):
+def test_remove_team_member(client, db_session, admin_user, regular_user, admin_auth_headers):
     """Test removing a member from a team."""
-    with app.app_context():
-        db = get_db()
-
-        # Create team with two members
-        team_id = db.resource_teams.insert(
-            name="Remove Member Team",
-            created_by=admin_user.id,
-            is_active=True
-        )
-
-        db.team_members.insert(
-            team_id=team_id,
-            user_id=admin_user.id,
-            role="owner",
-            added_by=admin_user.id
-        )
-
-        db.team_members.insert(
-            team_id=team_id,
-            user_id=regular_user.id,
-            role="member",
-            added_by=admin_user.id
-        )
-
-        db.commit()
-
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "admin@test.local", "password": "admin123"}
-        )
-
-        headers = {}
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
-
-        response = client.delete(
-            f"/api/v1/teams/{team_id}/members/{regular_user.id}",
-            headers=headers if headers else None
-        )
-
-        assert response.status_code in [200, 401, 403]
+    team_id = _seed_team(
+        db_session, "Remove Member Team", admin_user.id,
+        members=[(admin_user.id, "owner"), (regular_user.id, "member")]
+    )
+
+    response = client.delete(
+        f"/api/v1/teams/{team_id}/members/{regular_user.id}",
+        headers=admin_auth_headers
+    )
+
+    assert response.status_code == 200
 
 
 # ============================================================================
@@ -576,152 +276,68 @@ def test_remove_team_member(client, app, admin_user, regular_user):
 # ============================================================================
 
 @pytest.mark.api
-def test_assign_resource(client, app, admin_user):
+def test_assign_resource(client, db_session, admin_user, admin_auth_headers):
     """Test assigning a resource to a team."""
-    with app.app_context():
-        db = get_db()
-
-        # Create team
-        team_id = db.resource_teams.insert(
-            name="Resource Team",
-            created_by=admin_user.id,
-            is_active=True
-        )
-
-        # Add admin as owner
-        db.team_members.insert(
-            team_id=team_id,
-            user_id=admin_user.id,
-            role="owner",
-            added_by=admin_user.id
-        )
-
-        db.commit()
-
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "admin@test.local", "password": "admin123"}
-        )
-
-        headers = {}
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
-
-        response = client.post(
-            f"/api/v1/teams/{team_id}/resources",
-            json={
-                "resource_type": "cloud",
-                "resource_id": "aws-account-123",
-                "permissions": ["read", "write"]
-            },
-            headers=headers if headers else None
-        )
-
-        assert response.status_code in [201, 200, 401]
+    team_id = _seed_team(
+        db_session, "Resource Team", admin_user.id,
+        members=[(admin_user.id, "owner")]
+    )
+
+    response = client.post(
+        f"/api/v1/teams/{team_id}/resources",
+        json={
+            "resource_type": "cloud",
+            "resource_id": "aws-account-123",
+            "permissions": ["read", "write"]
+        },
+        headers=admin_auth_headers
+    )
+
+    assert response.status_code == 201
 
 
 @pytest.mark.api
-def test_list_team_resources(client, app, admin_user):
+def test_list_team_resources(client, db_session, admin_user, admin_auth_headers):
     """Test listing resources assigned to a team."""
-    with app.app_context():
-        db = get_db()
-
-        # Create team
-        team_id = db.resource_teams.insert(
-            name="Resources List Team",
-            created_by=admin_user.id,
-            is_active=True
-        )
-
-        # Add member
-        db.team_members.insert(
-            team_id=team_id,
-            user_id=admin_user.id,
-            role="owner",
-            added_by=admin_user.id
-        )
-
-        # Assign resources
-        db.resource_assignments.insert(
-            team_id=team_id,
-            resource_type="cloud",
-            resource_id="aws-123",
-            permissions='["read", "write"]',
-            assigned_by=admin_user.id
-        )
-
-        db.commit()
-
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "admin@test.local", "password": "admin123"}
-        )
-
-        headers = {}
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
-
-        response = client.get(
-            f"/api/v1/teams/{team_id}/resources",
-            headers=headers if headers else None
-        )
-
-        assert response.status_code in [200, 401]
-        if response.status_code == 200:
-            data = response.get_json()
-            assert "resources" in data or "count" in data
+    team_id = _seed_team(
+        db_session, "Resources List Team", admin_user.id,
+        members=[(admin_user.id, "owner")],
+        resources=[("cloud", "aws-123", '["read", "write"]')]
+    )
+
+    response = client.get(
+        f"/api/v1/teams/{team_id}/resources",
+        headers=admin_auth_headers
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["count"] == 1
 
 
 @pytest.mark.api
-def test_unassign_resource(client, app, admin_user):
+def test_unassign_resource(client, db_session, admin_user, admin_auth_headers):
     """Test unassigning a resource from a team."""
-    with app.app_context():
-        db = get_db()
-
-        # Create team
-        team_id = db.resource_teams.insert(
-            name="Unassign Resource Team",
-            created_by=admin_user.id,
-            is_active=True
-        )
-
-        # Add member
-        db.team_members.insert(
-            team_id=team_id,
-            user_id=admin_user.id,
-            role="owner",
-            added_by=admin_user.id
-        )
-
-        # Assign resource
-        assignment_id = db.resource_assignments.insert(
-            team_id=team_id,
-            resource_type="cloud",
-            resource_id="aws-456",
-            permissions='["read"]',
-            assigned_by=admin_user.id
-        )
-
-        db.commit()
-
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "admin@test.local", "password": "admin123"}
-        )
-
-        headers = {}
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
-
-        response = client.delete(
-            f"/api/v1/teams/{team_id}/resources/{assignment_id}",
-            headers=headers if headers else None
-        )
-
-        assert response.status_code in [200, 401, 403]
+    team_id = _seed_team(
+        db_session, "Unassign Resource Team", admin_user.id,
+        members=[(admin_user.id, "owner")]
+    )
+
+    # Assign resource
+    assignment_id = db_session.resource_assignments.insert(
+        team_id=team_id,
+        resource_type="cloud",
+        resource_id="aws-456",
+        permissions='["read"]',
+        assigned_by=admin_user.id
+    )
+
+    response = client.delete(
+        f"/api/v1/teams/{team_id}/resources/{assignment_id}",
+        headers=admin_auth_headers
+    )
+
+    assert response.status_code == 200
 
 
 # ============================================================================
@@ -729,79 +345,39 @@ def test_unassign_resource(client, app, admin_user):
 # ============================================================================
 
 @pytest.mark.api
-def test_team_not_found(client, app, admin_user):
+def test_team_not_found(client, admin_user, admin_auth_headers):
     """Test accessing non-existent team returns 404."""
-    with app.app_context():
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "admin@test.local", "password": "admin123"}
-        )
-
-        headers = {}
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
-
-        response = client.get(
-            "/api/v1/teams/99999",
-            headers=headers if headers else None
-        )
+    response = client.get(
+        "/api/v1/teams/99999",
+        headers=admin_auth_headers
+    )
 
-        assert response.status_code in [404, 401]
+    assert response.status_code == 404
 
 
 @pytest.mark.api
-def test_invalid_request_body(client, app, admin_user):
+def test_invalid_request_body(client, admin_user, admin_auth_headers):
     """Test invalid request body handling."""
-    with app.app_context():
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "admin@test.local", "password": "admin123"}
-        )
-
-        headers = {}
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
-
-        response = client.post(
-            "/api/v1/teams/",
-            json={"invalid_field": "value"},
-            headers=headers if headers else None
-        )
+    response = client.post(
+        "/api/v1/teams/",
+        json={"invalid_field": "value"},
+        headers=admin_auth_headers
+    )
 
-        assert response.status_code in [400, 401]
+    assert response.status_code == 400
 
 
 @pytest.mark.api
-def test_duplicate_team_name(client, app, admin_user):
+def test_duplicate_team_name(client, db_session, admin_user, admin_auth_headers):
     """Test duplicate team name returns 409."""
-    with app.app_context():
-        db = get_db()
-
-        # Create first team
-        db.resource_teams.insert(
-            name="Duplicate Test",
-            created_by=admin_user.id,
-            is_active=True
-        )
-        db.commit()
-
-        login_response = client.post(
-            "/api/v1/auth/login",
-            json={"email": "admin@test.local", "password": "admin123"}
-        )
-
-        headers = {}
-        if login_response.status_code == 200:
-            token = login_response.get_json().get("access_token")
-            headers = {"Authorization": f"Bearer {token}"}
-
-        # Try to create team with same name
-        response = client.post(
-            "/api/v1/teams/",
-            json={"name": "Duplicate Test"},
-            headers=headers if headers else None
-        )
-
-        assert response.status_code in [409, 401]
+    # Create first team
+    _seed_team(db_session, "Duplicate Test", admin_user.id)
+
+    # Try to create team with same name
+    response = client.post(
+        "/api/v1/teams/",
+        json={"name": "Duplicate Test"},
+        headers=admin_auth_headers
+    )
+
+    assert response.status_code == 409
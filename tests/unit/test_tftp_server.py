@@ -0,0 +1,60 @@
+"""Unit tests for the worker-ipxe TFTP file reader.
+
+Tests:
+- Files under the TFTP root are served
+- Traversal and absolute names cannot escape the TFTP root
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../services/worker-ipxe"))
+
+from worker.services.tftp_server import CachedFileReader
+
+
+@pytest.fixture
+def tftp_root(tmp_path):
+    """TFTP root holding one boot binary, with a secret file beside it."""
+    root = tmp_path / "tftp"
+    (root / "sub").mkdir(parents=True)
+    (root / "ipxe.efi").write_bytes(b"ipxe")
+    (tmp_path / "secret.txt").write_bytes(b"secret")
+    return root
+
+
+class TestCachedFileReaderPaths:
+    """Tests for resolving requested names under the TFTP root."""
+
+    def test_reads_file_under_root(self, tftp_root):
+        """Test a plain name is served from the TFTP root."""
+        reader = CachedFileReader(b"ipxe.efi", 512, root=tftp_root)
+
+        assert reader.read_chunk() == b"ipxe"
+
+    @pytest.mark.parametrize(
+        "fname",
+        [
+            b"../secret.txt",
+            b"sub/../../secret.txt",
+            b"./../secret.txt",
+        ],
+    )
+    def test_traversal_outside_root_rejected(self, tftp_root, fname):
+        """Test '..' segments cannot reach files outside the TFTP root."""
+        with pytest.raises(FileNotFoundError):
+            CachedFileReader(fname, 512, root=tftp_root)
+
+    def test_absolute_name_rejected(self, tftp_root):
+        """Test absolute names are rejected, even when inside the root."""
+        with pytest.raises(FileNotFoundError):
+            CachedFileReader(str(tftp_root / "ipxe.efi").encode(), 512, root=tftp_root)
+
+    def test_symlink_outside_root_rejected(self, tftp_root):
+        """Test a symlink pointing outside the TFTP root is not followed."""
+        (tftp_root / "link.txt").symlink_to(tftp_root.parent / "secret.txt")
+
+        with pytest.raises(FileNotFoundError):
+            CachedFileReader(b"link.txt", 512, root=tftp_root)